@@ -9,6 +9,8 @@ Ensures the agent only responds to cybersecurity training-related queries.
 import re
 from typing import Tuple, List
 
+from app.agents.regex_engine import compile_pattern
+
 
 class Guardrails:
     """
@@ -30,7 +32,9 @@ class Guardrails:
         "minutes", "started", "completion", "percentage", "ciso", "department"
     ]
     
-    # Forbidden keywords (not allowed)
+    # Forbidden keywords (not allowed). Both keyword lists are matched in a
+    # single scan (see _ALLOWED_RE / _FORBIDDEN_RE), so their order does not
+    # affect matching cost.
     FORBIDDEN_KEYWORDS = [
         # Database manipulation
         "update", "delete", "insert", "drop", "alter", "truncate", "create",
@@ -54,6 +58,27 @@ class Guardrails:
         r"(update\s+\w+\s+set)",
     ]
     
+    # Instruction patterns stripped from LLM responses
+    SANITIZE_PATTERNS = [
+        r"\[SYSTEM\].*?\[/SYSTEM\]",
+        r"<system>.*?</system>",
+        r"```sql.*?```",
+    ]
+    
+    # Compiled once at class load so the per-request path skips the re cache
+    _SQL_INJECTION_RE = compile_pattern(
+        "|".join(f"(?:{p})" for p in SQL_INJECTION_PATTERNS), ignore_case=True
+    )
+    _SANITIZE_RE = re.compile(
+        "|".join(SANITIZE_PATTERNS), re.IGNORECASE | re.DOTALL
+    )
+    
+    # Each keyword list folded into one literal alternation: a single scan
+    # over the query replaces one substring search per keyword. Under RE2
+    # this is one DFA pass in C regardless of the number of keywords.
+    _ALLOWED_RE = compile_pattern("|".join(map(re.escape, ALLOWED_TOPICS)))
+    _FORBIDDEN_RE = compile_pattern("|".join(map(re.escape, FORBIDDEN_KEYWORDS)))
+    
     @classmethod
     def is_training_related(cls, query: str) -> Tuple[bool, str]:
         """
@@ -65,12 +90,13 @@ class Guardrails:
         Returns:
             Tuple of (is_related, reason)
         """
-        query_lower = query.lower()
-        
+        return cls._is_training_related_impl(query.lower(), query)
+    
+    @classmethod
+    def _is_training_related_impl(cls, query_lower: str, query: str) -> Tuple[bool, str]:
+        """Topic check on an already-lowercased query"""
         # Check for allowed topics
-        has_allowed_topic = any(
-            keyword in query_lower for keyword in cls.ALLOWED_TOPICS
-        )
+        has_allowed_topic = cls._ALLOWED_RE.search(query_lower) is not None
         
         # If no allowed topics found, it might be off-topic
         if not has_allowed_topic and len(query.split()) > 3:
@@ -89,11 +115,13 @@ class Guardrails:
         Returns:
             Tuple of (is_safe, reason)
         """
-        query_lower = query.lower()
-        
-        for keyword in cls.FORBIDDEN_KEYWORDS:
-            if keyword in query_lower:
-                return False, f"This query contains forbidden operations. I can only provide read-only information about training status."
+        return cls._check_forbidden_keywords_impl(query.lower())
+    
+    @classmethod
+    def _check_forbidden_keywords_impl(cls, query_lower: str) -> Tuple[bool, str]:
+        """Forbidden keyword check on an already-lowercased query"""
+        if cls._FORBIDDEN_RE.search(query_lower):
+            return False, f"This query contains forbidden operations. I can only provide read-only information about training status."
         
         return True, ""
     
@@ -108,11 +136,13 @@ class Guardrails:
         Returns:
             Tuple of (is_safe, reason)
         """
-        query_lower = query.lower()
-        
-        for pattern in cls.SQL_INJECTION_PATTERNS:
-            if re.search(pattern, query_lower, re.IGNORECASE):
-                return False, "Invalid query format detected. Please use natural language questions."
+        return cls._check_sql_injection_impl(query.lower())
+    
+    @classmethod
+    def _check_sql_injection_impl(cls, query_lower: str) -> Tuple[bool, str]:
+        """SQL injection check on an already-lowercased query"""
+        if cls._SQL_INJECTION_RE.search(query_lower):
+            return False, "Invalid query format detected. Please use natural language questions."
         
         return True, ""
     
@@ -135,21 +165,29 @@ class Guardrails:
         if len(query) > 1000:
             return False, "Query is too long. Please keep questions concise."
         
-        # SQL injection check
-        is_safe, reason = cls.check_sql_injection(query)
-        if not is_safe:
-            return False, reason
+        # Lowercase once and share it across every check. str.lower() already
+        # has an ASCII fast path; encoding to bytes and translating measured
+        # about twice as slow, so the query stays a str.
+        query_lower = query.lower()
+        
+        # Cheapest and most common rejections first; the SQL injection
+        # regex only runs on queries that passed the keyword scans
         
         # Forbidden keywords check
-        is_safe, reason = cls.check_forbidden_keywords(query)
+        is_safe, reason = cls._check_forbidden_keywords_impl(query_lower)
         if not is_safe:
             return False, reason
         
         # Topic relevance check
-        is_relevant, reason = cls.is_training_related(query)
+        is_relevant, reason = cls._is_training_related_impl(query_lower, query)
         if not is_relevant:
             return False, reason
         
+        # SQL injection check
+        is_safe, reason = cls._check_sql_injection_impl(query_lower)
+        if not is_safe:
+            return False, reason
+        
         return True, ""
     
     @classmethod
@@ -164,19 +202,29 @@ class Guardrails:
             Sanitized response
         """
         # Remove any accidentally leaked system prompts or instructions
-        sanitized = response
-        
-        # Remove common instruction patterns
-        patterns_to_remove = [
-            r"\[SYSTEM\].*?\[/SYSTEM\]",
-            r"<system>.*?</system>",
-            r"```sql.*?```",
-        ]
+        return cls._strip_instructions(response).strip()
+    
+    @classmethod
+    def _strip_instructions(cls, text: str) -> str:
+        """
+        Remove instruction blocks until none are left.
         
-        for pattern in patterns_to_remove:
-            sanitized = re.sub(pattern, "", sanitized, flags=re.IGNORECASE | re.DOTALL)
+        Blocks are removed leftmost first and the text is rescanned after
+        each removal, because joining the text around a removed block can
+        form a new one (e.g. "<sys[SYSTEM]x[/SYSTEM]tem>...</system>"). A
+        response without blocks costs a single scan.
         
-        return sanitized.strip()
+        Args:
+            text: Text to clean
+            
+        Returns:
+            Text without instruction blocks
+        """
+        block = cls._SANITIZE_RE.search(text)
+        while block is not None:
+            text = text[:block.start()] + text[block.end():]
+            block = cls._SANITIZE_RE.search(text)
+        return text
     
     @classmethod
     def get_rejection_message(cls) -> str:
@@ -195,3 +243,103 @@ class Guardrails:
             "- CISO reports and summaries"
         )
 
+
+
+class ResponseStreamSanitizer:
+    """
+    Incremental version of Guardrails.sanitize_response for streamed text.
+    
+    Chunks are fed in as they arrive from the LLM. Text that may still turn
+    into a stripped block (an opening marker, or a possible prefix of one
+    before it or at the end of a chunk) is held back until it is either
+    closed and removed or proven harmless. Removed blocks are rejoined and
+    rescanned like in sanitize_response, so the concatenated output equals
+    sanitize_response on the full text.
+    """
+    
+    # Lowercased opening markers of Guardrails.SANITIZE_PATTERNS
+    OPENING_MARKERS = ("[system]", "<system>", "```sql")
+    
+    _OPENING_RE = re.compile("|".join(map(re.escape, OPENING_MARKERS)), re.IGNORECASE)
+    
+    def __init__(self):
+        """Initialize an empty sanitizer"""
+        self._buffer = ""
+        self._pending_space = ""
+        self._started = False
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of the response.
+        
+        Args:
+            chunk: Next piece of LLM output
+            
+        Returns:
+            Sanitized text that is safe to send now (may be empty)
+        """
+        self._buffer += chunk
+        
+        while True:
+            opening = self._OPENING_RE.search(self._buffer)
+            if opening is None:
+                # Keep a trailing partial marker (e.g. "<sys") for the next chunk
+                hold_from = self._partial_marker_start(len(self._buffer))
+                break
+            
+            block = Guardrails._SANITIZE_RE.match(self._buffer, opening.start())
+            if block is None:
+                # Block not closed yet: hold it, and a partial marker just
+                # before it, until more text arrives
+                hold_from = self._partial_marker_start(opening.start())
+                break
+            
+            # Rejoin the text around the block; it may form a new marker
+            self._buffer = self._buffer[:opening.start()] + self._buffer[block.end():]
+        
+        safe_text = self._buffer[:hold_from]
+        self._buffer = self._buffer[hold_from:]
+        return self._emit(safe_text)
+    
+    def finish(self) -> str:
+        """
+        Flush the end of the response.
+        
+        Returns:
+            Remaining sanitized text
+        """
+        remaining = Guardrails._strip_instructions(self._buffer)
+        self._buffer = ""
+        return self._emit(remaining)
+    
+    def _partial_marker_start(self, end: int) -> int:
+        """
+        Get the start of the possible marker prefixes ending at end, or end.
+        
+        Prefixes directly before a prefix are held too (e.g. "<sys[SYS"):
+        once a block after them is removed they can join into a marker.
+        """
+        max_tail = max(map(len, self.OPENING_MARKERS)) - 1
+        hold_from = end
+        while True:
+            for index in range(max(0, hold_from - max_tail), hold_from):
+                tail = self._buffer[index:hold_from].lower()
+                if any(marker.startswith(tail) for marker in self.OPENING_MARKERS):
+                    hold_from = index
+                    break
+            else:
+                return hold_from
+    
+    def _emit(self, text: str) -> str:
+        """Apply the leading/trailing whitespace strip of sanitize_response"""
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        
+        # Trailing whitespace is only released once more text follows it
+        text = self._pending_space + text
+        stripped = text.rstrip()
+        self._pending_space = text[len(stripped):]
+        return stripped
@@ -10,6 +10,8 @@ import re
 from typing import Dict, Optional, List
 from enum import Enum
 
+from app.agents.regex_engine import PatternSet, compile_pattern
+
 
 class Intent(Enum):
     """Enumeration of possible user intents"""
@@ -33,7 +35,8 @@ class IntentParser:
     Uses keyword matching and pattern recognition for intent classification.
     """
     
-    # Intent patterns (keyword-based)
+    # Intent patterns (keyword-based). Order is significant: the first
+    # intent with a matching pattern wins, so do not sort by hit rate.
     INTENT_PATTERNS = {
         Intent.CHECK_COMPLETION: [
             r"\b(did|have|has|completed|finished|done)\b.*\b(training|videos?|courses?)\b",
@@ -76,6 +79,78 @@ class IntentParser:
         ],
     }
     
+    # Employee name patterns (case-sensitive, names are capitalized)
+    # Pattern 1: "did/has/for [Capitalized Name]"
+    # Pattern 2: "[Capitalized Name]'s"
+    # Pattern 3: "[Capitalized Name] status/progress/training"
+    EMPLOYEE_NAME_PATTERNS = [
+        r'\b(?:did|has|for|about)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)',
+        r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\'s',
+        r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\s+(?:status|progress|training|finish)',
+    ]
+    
+    # Status phrases per label, checked in order ("not started" before "started")
+    STATUS_KEYWORDS = {
+        "NOT_STARTED": ["not started", "haven't started"],
+        "IN_PROGRESS": ["in progress", "ongoing", "started"],
+        "FINISHED": ["finished", "completed", "done"],
+    }
+    
+    # Employee mention patterns per label, checked in order.
+    # Pronouns are matched as whole words so "i" does not hit "video".
+    MENTION_PATTERNS = {
+        "self": [r"\b(my|i|me|myself)\b"],
+        "other": [r"\b(his|her|their)\b", r"employee"],
+    }
+    
+    # Video count filter: optional operator phrase before or after the number
+    VIDEO_COUNT_PATTERN = (
+        r"(?:\b(?P<pre>at least|at most|less than|fewer than|more than|exactly)\s+)?"
+        r"\b(?P<num>\d+|one|two|three|four|five)\b"
+        r"(?:\s+(?:videos?\s+)?(?P<post>or more|or less)\b)?"
+    )
+    
+    # Operator phrases and number words used by the video count filter
+    COUNT_OPERATORS = {
+        "or more": ">=", "at least": ">=",
+        "or less": "<=", "at most": "<=",
+        "less than": "<", "fewer than": "<",
+        "more than": ">",
+        "exactly": "==",
+    }
+    NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+    
+    # Keywords marking a CISO-level query (about multiple employees)
+    CISO_KEYWORDS = [
+        "all employees", "everyone", "global", "overall", "company",
+        "organization", "statistics", "report", "summary of all",
+        "fastest", "slowest", "average", "list employees"
+    ]
+    
+    # Compiled once at class load so the per-request path skips the re cache.
+    # Pattern sets scan every alternative in one pass and report the first
+    # match in priority order; the *_BY_INDEX / *_LABELS tuples decode it.
+    _INTENT_SET = PatternSet(
+        (p for patterns in INTENT_PATTERNS.values() for p in patterns),
+        ignore_case=True,
+    )
+    _INTENT_BY_INDEX = tuple(
+        intent for intent, patterns in INTENT_PATTERNS.items() for _ in patterns
+    )
+    _STATUS_SET = PatternSet(
+        "|".join(map(re.escape, keywords)) for keywords in STATUS_KEYWORDS.values()
+    )
+    _STATUS_LABELS = tuple(STATUS_KEYWORDS)
+    _MENTION_SET = PatternSet(
+        "|".join(patterns) for patterns in MENTION_PATTERNS.values()
+    )
+    _MENTION_LABELS = tuple(MENTION_PATTERNS)
+    _CISO_RE = compile_pattern("|".join(map(re.escape, CISO_KEYWORDS)))
+    # "video X", "video number X", "module X", "lesson X" or "#X"
+    _VIDEO_NUM_RE = re.compile(r"(?:video\s+(?:number\s+)?|module\s+|lesson\s+|#)(\d+)")
+    _NAME_RES = tuple(re.compile(p) for p in EMPLOYEE_NAME_PATTERNS)
+    _COUNT_RE = compile_pattern(VIDEO_COUNT_PATTERN)
+    
     @classmethod
     def extract_video_number(cls, query: str) -> Optional[int]:
         """
@@ -87,21 +162,16 @@ class IntentParser:
         Returns:
             Video number (1-5) if found, None otherwise
         """
-        # Look for "video X" or "video number X"
-        patterns = [
-            r"video\s+(\d+)",
-            r"video\s+number\s+(\d+)",
-            r"module\s+(\d+)",
-            r"lesson\s+(\d+)",
-            r"#(\d+)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, query.lower())
-            if match:
-                num = int(match.group(1))
-                if 1 <= num <= 5:
-                    return num
+        return cls._extract_video_number_impl(query.lower())
+    
+    @classmethod
+    def _extract_video_number_impl(cls, query_lower: str) -> Optional[int]:
+        """Video number extraction on an already-lowercased query"""
+        match = cls._VIDEO_NUM_RE.search(query_lower)
+        if match:
+            num = int(match.group(1))
+            if 1 <= num <= 5:
+                return num
         
         return None
     
@@ -116,14 +186,14 @@ class IntentParser:
         Returns:
             Status (NOT_STARTED, IN_PROGRESS, FINISHED) if found, None otherwise
         """
-        query_lower = query.lower()
-        
-        if "not started" in query_lower or "haven't started" in query_lower:
-            return "NOT_STARTED"
-        elif "in progress" in query_lower or "ongoing" in query_lower or "started" in query_lower:
-            return "IN_PROGRESS"
-        elif "finished" in query_lower or "completed" in query_lower or "done" in query_lower:
-            return "FINISHED"
+        return cls._extract_status_impl(query.lower())
+    
+    @classmethod
+    def _extract_status_impl(cls, query_lower: str) -> Optional[str]:
+        """Status extraction on an already-lowercased query"""
+        index = cls._STATUS_SET.first_match(query_lower)
+        if index is not None:
+            return cls._STATUS_LABELS[index]
         
         return None
     
@@ -138,12 +208,14 @@ class IntentParser:
         Returns:
             "self" if asking about themselves, "other" if asking about another employee
         """
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["my", "i", "me", "myself"]):
-            return "self"
-        elif any(word in query_lower for word in ["his", "her", "their", "employee"]):
-            return "other"
+        return cls._extract_employee_mention_impl(query.lower())
+    
+    @classmethod
+    def _extract_employee_mention_impl(cls, query_lower: str) -> Optional[str]:
+        """Employee mention detection on an already-lowercased query"""
+        index = cls._MENTION_SET.first_match(query_lower)
+        if index is not None:
+            return cls._MENTION_LABELS[index]
         
         return "self"  # Default to self
     
@@ -163,19 +235,12 @@ class IntentParser:
         Returns:
             Employee name if found, None otherwise
         """
-        import re
-        
-        # Pattern 1: "did/has/for [Capitalized Name]"
-        # Pattern 2: "[Capitalized Name]'s"
-        # Pattern 3: "[Capitalized Name] status/progress/training"
-        patterns = [
-            r'\b(?:did|has|for|about)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)',
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\'s',
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\s+(?:status|progress|training|finish)',
-        ]
+        # Names must be capitalized; most queries are typed in lowercase
+        if query.islower():
+            return None
         
-        for pattern in patterns:
-            match = re.search(pattern, query)
+        for regex in cls._NAME_RES:
+            match = regex.search(query)
             if match:
                 return match.group(1)
         
@@ -197,35 +262,21 @@ class IntentParser:
         Returns:
             Dictionary with count and operator, or None
         """
-        import re
-        
-        query_lower = query.lower()
-        
-        # Extract number
-        number_match = re.search(r'\b(\d+|one|two|three|four|five)\b', query_lower)
-        if not number_match:
+        return cls._extract_video_count_filter_impl(query.lower())
+    
+    @classmethod
+    def _extract_video_count_filter_impl(cls, query_lower: str) -> Optional[Dict[str, any]]:
+        """Video count filter extraction on an already-lowercased query"""
+        # Number and operator phrase are captured in one search
+        match = cls._COUNT_RE.search(query_lower)
+        if not match:
             return None
         
-        num_str = number_match.group(1)
-        word_to_num = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
-        count = word_to_num.get(num_str, int(num_str) if num_str.isdigit() else None)
+        num_str = match.group("num")
+        count = cls.NUMBER_WORDS.get(num_str) or int(num_str)
         
-        if count is None:
-            return None
-        
-        # Determine operator
-        if "or more" in query_lower or "at least" in query_lower:
-            operator = ">="
-        elif "or less" in query_lower or "at most" in query_lower:
-            operator = "<="
-        elif "less than" in query_lower or "fewer than" in query_lower:
-            operator = "<"
-        elif "more than" in query_lower:
-            operator = ">"
-        elif "exactly" in query_lower:
-            operator = "=="
-        else:
-            operator = ">="  # Default
+        op_phrase = match.group("pre") or match.group("post")
+        operator = cls.COUNT_OPERATORS.get(op_phrase, ">=")  # Default to >=
         
         return {"count": count, "operator": operator}
     
@@ -240,13 +291,15 @@ class IntentParser:
         Returns:
             Classified intent
         """
-        query_lower = query.lower()
-        
-        # Check each intent pattern
-        for intent, patterns in cls.INTENT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, query_lower, re.IGNORECASE):
-                    return intent
+        return cls._classify_intent_impl(query.lower())
+    
+    @classmethod
+    def _classify_intent_impl(cls, query_lower: str) -> Intent:
+        """Intent classification on an already-lowercased query"""
+        # First intent (in pattern order) with a matching pattern wins
+        index = cls._INTENT_SET.first_match(query_lower)
+        if index is not None:
+            return cls._INTENT_BY_INDEX[index]
         
         # Default to general question
         return Intent.GENERAL_QUESTION
@@ -262,16 +315,18 @@ class IntentParser:
         Returns:
             Dictionary with intent and extracted parameters
         """
-        intent = cls.classify_intent(query)
+        # Lowercase once and share it across every extractor
+        query_lower = query.lower()
+        intent = cls._classify_intent_impl(query_lower)
         
         result = {
             "intent": intent,
             "query": query,
-            "video_number": cls.extract_video_number(query),
-            "status": cls.extract_status(query),
-            "employee_mention": cls.extract_employee_mention(query),
+            "video_number": cls._extract_video_number_impl(query_lower),
+            "status": cls._extract_status_impl(query_lower),
+            "employee_mention": cls._extract_employee_mention_impl(query_lower),
             "employee_name": cls.extract_employee_name(query),
-            "video_count_filter": cls.extract_video_count_filter(query),
+            "video_count_filter": cls._extract_video_count_filter_impl(query_lower),
         }
         
         return result
@@ -287,13 +342,5 @@ class IntentParser:
         Returns:
             True if CISO query, False otherwise
         """
-        query_lower = query.lower()
-        
-        ciso_keywords = [
-            "all employees", "everyone", "global", "overall", "company",
-            "organization", "statistics", "report", "summary of all",
-            "fastest", "slowest", "average", "list employees"
-        ]
-        
-        return any(keyword in query_lower for keyword in ciso_keywords)
+        return cls._CISO_RE.search(query.lower()) is not None
 
@@ -0,0 +1,102 @@
+"""
+Regex Engine Module
+~~~~~~~~~~~~~~~~~~~
+
+Compiles the patterns that run against free-form user queries.
+Uses Google RE2 when it is installed: RE2 matches in linear time without
+backtracking, so adversarial queries cannot trigger catastrophic matching.
+Falls back to the standard library ``re`` module otherwise.
+
+Compiled patterns and pattern sets keep no per-match state, so the
+class-level instances are shared by all worker threads without locking
+or per-thread copies.
+"""
+
+import re
+from typing import Any, Iterable, Optional
+
+try:
+    import re2
+except ImportError:  # pragma: no cover - depends on the deployment image
+    re2 = None
+
+
+# Whether user-query patterns are compiled with RE2
+HAS_RE2 = re2 is not None
+
+
+def compile_pattern(pattern: str, ignore_case: bool = False) -> Any:
+    """
+    Compile a pattern with RE2 if available, otherwise with ``re``.
+
+    Both engines expose the same ``search``/``match``/``group`` API used by
+    the guardrails and intent parser. Compilation happens at import time, so
+    a pattern RE2 cannot handle (e.g. a backreference) fails on startup
+    rather than on a request.
+
+    Args:
+        pattern: Regular expression source
+        ignore_case: Whether matching is case-insensitive
+
+    Returns:
+        Compiled pattern object
+    """
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = not ignore_case
+        return re2.compile(pattern, options)
+
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+
+class PatternSet:
+    """
+    Ordered set of patterns matched against a string in one pass.
+    
+    With RE2 all patterns are compiled into a single ``re2.Set`` automaton,
+    so one scan reports every pattern that matches. Without RE2 the patterns
+    are searched one by one in order.
+    """
+    
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False):
+        """
+        Compile the pattern set.
+        
+        Args:
+            patterns: Regular expression sources, in priority order
+            ignore_case: Whether matching is case-insensitive
+        """
+        patterns = tuple(patterns)
+        self._set = None
+        self._regexes = ()
+        
+        # Only one representation is kept: the RE2 set, or the per-pattern
+        # tuple the fallback loop needs
+        if re2 is not None:
+            options = re2.Options()
+            options.case_sensitive = not ignore_case
+            self._set = re2.Set.SearchSet(options)
+            for pattern in patterns:
+                self._set.Add(pattern)
+            self._set.Compile()
+        else:
+            self._regexes = tuple(compile_pattern(p, ignore_case) for p in patterns)
+    
+    def first_match(self, text: str) -> Optional[int]:
+        """
+        Find the highest-priority pattern that matches anywhere in text.
+        
+        Args:
+            text: String to scan
+            
+        Returns:
+            Index of the first matching pattern, or None if none match
+        """
+        if self._set is not None:
+            hits = self._set.Match(text)
+            return min(hits) if hits else None
+        
+        for index, regex in enumerate(self._regexes):
+            if regex.search(text):
+                return index
+        return None
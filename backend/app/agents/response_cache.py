@@ -0,0 +1,75 @@
+"""
+Response Cache Module
+~~~~~~~~~~~~~~~~~~~~~
+
+In-memory cache of agent responses for repeated questions.
+Lets the agent skip data retrieval and the LLM round-trip when a user
+asks the same question again within the cache TTL.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class ResponseCache(TTLCache):
+    """
+    Bounded TTL cache for agent responses.
+    
+    Keys combine the parsed request with the asking user, so repeated
+    questions are answered from the cache without crossing users.
+    """
+    
+    @staticmethod
+    def make_key(
+        query: str,
+        parsed: Dict,
+        employee_id: Optional[int],
+        is_ciso: bool,
+        target_employee_id: Optional[int]
+    ) -> Tuple:
+        """
+        Build a cache key for a parsed query asked by a given user.
+        
+        The key is built after intent parsing and name resolution: it holds
+        the intent, the resolved target employee and the parsed parameters,
+        including the employee name exactly as extracted (name extraction is
+        case-sensitive). Only then is the query text normalized (case,
+        whitespace, trailing punctuation), so phrasings share an entry only
+        when they parse to the same request. The user is part of the key, so
+        cached answers never cross users.
+        
+        Args:
+            query: User query
+            parsed: Parsed query data from IntentParser.parse
+            employee_id: Authenticated employee ID
+            is_ciso: Whether the user is the CISO
+            target_employee_id: Employee the query is about (None if the
+                named employee was not found)
+            
+        Returns:
+            Hashable cache key
+        """
+        video_count_filter = parsed["video_count_filter"]
+        if video_count_filter:
+            video_count_filter = (video_count_filter["count"], video_count_filter["operator"])
+        normalized = " ".join(query.lower().split()).rstrip("?!. ")
+        return (
+            employee_id,
+            is_ciso,
+            parsed["intent"],
+            target_employee_id,
+            parsed["employee_name"],
+            parsed["video_number"],
+            parsed["status"],
+            video_count_filter,
+            normalized,
+        )
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    max_entries=settings.response_cache_max_entries,
+)
@@ -6,16 +6,145 @@ Main AI agent for handling cybersecurity training queries.
 Integrates LLM with guardrails, intent parsing, and database queries.
 """
 
-from typing import Dict, Optional
+import io
+import logging
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
-import openai
-from anthropic import Anthropic
+from starlette.concurrency import run_in_threadpool
+from openai import AsyncOpenAI
+from anthropic import AsyncAnthropic
 
 from app.core.config import settings
 from app.services.training_service import TrainingService
 from app.services.auth_service import AuthService
-from app.agents.guardrails import Guardrails
+from app.agents.guardrails import Guardrails, ResponseStreamSanitizer
 from app.agents.intent_parser import IntentParser, Intent
+from app.agents.response_cache import response_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Provider selection, fixed for the lifetime of the process
+USE_OPENAI = settings.llm_provider == "openai" and bool(settings.openai_api_key)
+USE_ANTHROPIC = settings.llm_provider == "anthropic" and bool(settings.anthropic_api_key)
+
+# Worked response examples appended to the system prompt. Each data example
+# is the rule-based formatter's exact output for its data (kept in sync by
+# tests/test_training_agent.py).
+_EXAMPLES_HEADER = """
+
+RESPONSE EXAMPLES:"""
+
+_STATUS_EXAMPLE = """
+
+Example - individual status
+RELEVANT DATA:
+employee_name: Dana Levi
+status: IN_PROGRESS
+completion_percentage: 50.0
+completed_videos: 1, 2
+missing_videos: 3, 4
+total_time_minutes: 42
+USER QUESTION: What is my training status?
+Response:
+**Training Status for Dana Levi**
+
+Status: **IN_PROGRESS**
+Completion: **50.0%**
+
+**Completed Videos:** 2 out of 5
+Video numbers: [1, 2]
+
+**Missing Videos:** 2
+Video numbers: [3, 4]
+
+**Total Time Spent:** 42 minutes"""
+
+_VIDEOS_EXAMPLE = """
+
+Example - missing videos
+RELEVANT DATA:
+missing_videos: 4
+video_details: {'video_number': 4, 'video_name': 'Fourth Cybersecurity Video', 'completed': False, 'duration_minutes': 0.0}
+USER QUESTION: Which videos do I still need to watch?
+Response:
+**Missing Videos:** 1
+Video numbers: [4]
+
+**Detailed Video Status:**
+❌ Video 4: Fourth Cybersecurity Video (0.0 min)"""
+
+_GLOBAL_EXAMPLE = """
+
+Example - company-wide statistics (CISO only)
+RELEVANT DATA:
+total_employees: 120
+finished_employees_count: 80
+not_started_count: 15
+in_progress_count: 25
+max_time_minutes: 95.0
+min_time_minutes: 30.0
+average_time_minutes: 55.5
+fastest_employee:
+  - id: 123456780
+  - name: Noa Cohen
+  - time_minutes: 30.0
+slowest_employee:
+  - id: 123456781
+  - name: Avi Levi
+  - time_minutes: 95.0
+USER QUESTION: How is the company doing overall?
+Response:
+**Company-wide Training Statistics:**
+
+📊 Total Employees: 120
+✅ Finished: 80
+🔄 In Progress: 25
+⏸️  Not Started: 15
+
+⏱️  **Completion Times:**
+Average: 55.5 minutes
+Minimum: 30.0 minutes
+Maximum: 95.0 minutes
+
+🚀 Fastest: Noa Cohen (30.0 min)
+🐢 Slowest: Avi Levi (95.0 min)"""
+
+_OFF_TOPIC_EXAMPLE = """
+
+Example - off-topic request
+USER QUESTION: Can you write me a poem?
+Response:
+I can only help with cybersecurity training questions. For example, you can ask which videos you have completed or how much time you have spent on training."""
+
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Get the shared OpenAI client.
+    
+    The client owns an HTTP connection pool, so one instance is reused by
+    every agent to keep provider connections alive across requests.
+    
+    Returns:
+        Async OpenAI client
+    """
+    return AsyncOpenAI(api_key=settings.openai_api_key)
+
+
+@lru_cache(maxsize=1)
+def get_anthropic_client() -> AsyncAnthropic:
+    """
+    Get the shared Anthropic client.
+    
+    The client owns an HTTP connection pool, so one instance is reused by
+    every agent to keep provider connections alive across requests.
+    
+    Returns:
+        Async Anthropic client
+    """
+    return AsyncAnthropic(api_key=settings.anthropic_api_key)
 
 
 class TrainingAgent:
@@ -30,6 +159,23 @@ class TrainingAgent:
     5. Enforces read-only operations
     """
     
+    # Intents whose answer is fully determined by the retrieved data: they
+    # are answered by the rule-based formatter without calling the LLM
+    TEMPLATED_INTENTS = frozenset({
+        Intent.CHECK_COMPLETION,
+        Intent.LIST_COMPLETED_VIDEOS,
+        Intent.LIST_MISSING_VIDEOS,
+        Intent.VIDEO_DURATION,
+        Intent.LIST_BY_STATUS,
+        Intent.LIST_BY_VIDEO_COUNT,
+    })
+    
+    # Agents are built per request; fixed slots skip the instance dict
+    __slots__ = (
+        "db", "training_service", "auth_service", "_status_cache",
+        "openai_client", "anthropic_client",
+    )
+    
     # System prompt for the LLM
     SYSTEM_PROMPT = """You are a helpful AI assistant for a cybersecurity training platform.
 
@@ -59,6 +205,33 @@ RESPONSE STYLE:
 
 When given data, format it in a clear, readable way for the user."""
     
+    # System prompt per intent: the rules plus only the worked examples
+    # relevant to that kind of question. Other intents that reach the LLM
+    # use all examples.
+    SYSTEM_PROMPTS = {
+        Intent.EMPLOYEE_STATUS: SYSTEM_PROMPT + _EXAMPLES_HEADER + _STATUS_EXAMPLE + _OFF_TOPIC_EXAMPLE,
+        Intent.GLOBAL_SUMMARY: SYSTEM_PROMPT + _EXAMPLES_HEADER + _GLOBAL_EXAMPLE + _OFF_TOPIC_EXAMPLE,
+    }
+    DEFAULT_SYSTEM_PROMPT = (
+        SYSTEM_PROMPT + _EXAMPLES_HEADER + _STATUS_EXAMPLE + _VIDEOS_EXAMPLE
+        + _GLOBAL_EXAMPLE + _OFF_TOPIC_EXAMPLE
+    )
+    
+    # The same prompts as content blocks, each marked as a cacheable prefix
+    SYSTEM_PROMPT_BLOCKS = {
+        intent: [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
+        for intent, prompt in SYSTEM_PROMPTS.items()
+    }
+    DEFAULT_SYSTEM_PROMPT_BLOCKS = [
+        {"type": "text", "text": DEFAULT_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+    ]
+    
+    # Single-value lines of the rule-based response: (key, prefix, suffix)
+    _MOCK_SUMMARY_FIELDS = (
+        ("status", "Status: **", "**\n"),
+        ("completion_percentage", "Completion: **", "%**\n"),
+    )
+    
     def __init__(self, db: Session):
         """
         Initialize training agent.
@@ -70,66 +243,169 @@ When given data, format it in a clear, readable way for the user."""
         self.training_service = TrainingService(db)
         self.auth_service = AuthService(db)
         
+        # Employee status fetched during this request, keyed by employee ID
+        self._status_cache: Dict[int, Dict] = {}
+        
         # Initialize LLM based on provider
         self._init_llm()
     
     def _init_llm(self) -> None:
-        """Initialize LLM client based on configuration"""
-        if settings.llm_provider == "openai":
-            openai.api_key = settings.openai_api_key
-        elif settings.llm_provider == "anthropic":
-            self.anthropic_client = Anthropic(api_key=settings.anthropic_api_key)
+        """Attach the shared LLM client based on configuration"""
+        if USE_OPENAI:
+            self.openai_client = get_openai_client()
+        elif USE_ANTHROPIC:
+            self.anthropic_client = get_anthropic_client()
     
-    def _call_llm(self, user_message: str, context_data: Optional[Dict] = None) -> str:
+    def _build_messages(self, user_message: str, context_data: Optional[Dict] = None) -> List[Dict]:
         """
-        Call LLM with user message and optional context data.
+        Build the user messages sent after the system prompt.
         
         Args:
             user_message: User's question
             context_data: Optional data to provide as context
             
         Returns:
-            LLM response
+            List of chat messages
         """
-        # Build the user prompt with context
+        # Static prefix first, dynamic data last: the system prompt is sent
+        # byte-identical on every call so the provider can cache it, and the
+        # per-request context goes in its own message after it
+        messages = []
         if context_data:
-            context_str = f"\n\nRELEVANT DATA:\n{self._format_context_data(context_data)}\n\n"
-            full_prompt = f"{context_str}USER QUESTION: {user_message}\n\nProvide a clear, natural response based on the data above."
+            messages.append({
+                "role": "user",
+                "content": f"RELEVANT DATA:\n{self._format_context_data(context_data)}"
+            })
+            messages.append({
+                "role": "user",
+                "content": f"USER QUESTION: {user_message}\n\nProvide a clear, natural response based on the data above."
+            })
         else:
-            full_prompt = user_message
+            messages.append({"role": "user", "content": user_message})
+        return messages
+    
+    async def _call_llm(
+        self,
+        user_message: str,
+        context_data: Optional[Dict] = None,
+        intent: Optional[Intent] = None
+    ) -> Tuple[str, bool]:
+        """
+        Call LLM with user message and optional context data.
+        
+        The provider call is awaited, so a slow completion does not hold a
+        worker thread while it is in flight.
+        
+        Args:
+            user_message: User's question
+            context_data: Optional data to provide as context
+            intent: Parsed intent, used to pick the system prompt
+            
+        Returns:
+            Tuple of (response, fell_back). fell_back is True when the LLM
+            call failed and the rule-based response was used instead.
+        """
+        if intent in self.TEMPLATED_INTENTS:
+            return self._mock_response(user_message, context_data), False
+        
+        messages = self._build_messages(user_message, context_data)
         
         try:
-            if settings.llm_provider == "openai" and settings.openai_api_key:
-                response = openai.chat.completions.create(
+            if USE_OPENAI:
+                # OpenAI caches identical prompt prefixes automatically
+                response = await self.openai_client.chat.completions.create(
                     model=settings.openai_model,
                     messages=[
-                        {"role": "system", "content": self.SYSTEM_PROMPT},
-                        {"role": "user", "content": full_prompt}
+                        {"role": "system", "content": self.SYSTEM_PROMPTS.get(intent, self.DEFAULT_SYSTEM_PROMPT)},
+                        *messages
                     ],
                     temperature=0.7,
                     max_tokens=1000
                 )
-                return response.choices[0].message.content
+                return response.choices[0].message.content, False
             
-            elif settings.llm_provider == "anthropic" and settings.anthropic_api_key:
-                message = self.anthropic_client.messages.create(
+            elif USE_ANTHROPIC:
+                # Anthropic needs an explicit cache breakpoint on the system block;
+                # consecutive user messages are merged into a single turn by the API
+                message = await self.anthropic_client.messages.create(
                     model=settings.anthropic_model,
                     max_tokens=1000,
-                    system=self.SYSTEM_PROMPT,
-                    messages=[
-                        {"role": "user", "content": full_prompt}
-                    ]
+                    system=self.SYSTEM_PROMPT_BLOCKS.get(intent, self.DEFAULT_SYSTEM_PROMPT_BLOCKS),
+                    messages=messages
                 )
-                return message.content[0].text
+                return message.content[0].text, False
             
             else:
                 # Fallback for local/mock or missing API key
-                return self._mock_response(user_message, context_data)
+                return self._mock_response(user_message, context_data), False
         
         except Exception as e:
             # Log error and fallback to rule-based response on LLM error
-            print(f"LLM Error: {str(e)}")
-            return self._mock_response(user_message, context_data)
+            logger.warning("LLM error, using rule-based response", exc_info=e)
+            return self._mock_response(user_message, context_data), True
+    
+    async def _stream_llm(
+        self,
+        user_message: str,
+        context_data: Optional[Dict] = None,
+        intent: Optional[Intent] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the LLM response as it is generated.
+        
+        Args:
+            user_message: User's question
+            context_data: Optional data to provide as context
+            intent: Parsed intent, used to pick the system prompt
+            
+        Yields:
+            Raw (unsanitized) pieces of the response text
+            
+        Raises:
+            Exception: The provider error, if the stream fails
+        """
+        if intent in self.TEMPLATED_INTENTS:
+            yield self._mock_response(user_message, context_data)
+            return
+        
+        messages = self._build_messages(user_message, context_data)
+        
+        try:
+            if USE_OPENAI:
+                stream = await self.openai_client.chat.completions.create(
+                    model=settings.openai_model,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPTS.get(intent, self.DEFAULT_SYSTEM_PROMPT)},
+                        *messages
+                    ],
+                    temperature=0.7,
+                    max_tokens=1000,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            
+            elif USE_ANTHROPIC:
+                stream = await self.anthropic_client.messages.create(
+                    model=settings.anthropic_model,
+                    max_tokens=1000,
+                    system=self.SYSTEM_PROMPT_BLOCKS.get(intent, self.DEFAULT_SYSTEM_PROMPT_BLOCKS),
+                    messages=messages,
+                    stream=True
+                )
+                async for event in stream:
+                    if event.type == "content_block_delta" and event.delta.text:
+                        yield event.delta.text
+            
+            else:
+                # Fallback for local/mock or missing API key
+                yield self._mock_response(user_message, context_data)
+        
+        except Exception as e:
+            # Log error; the caller decides whether it can still fall back
+            logger.warning("LLM streaming error", exc_info=e)
+            raise
     
     def _mock_response(self, user_message: str, context_data: Optional[Dict] = None) -> str:
         """
@@ -145,66 +421,93 @@ When given data, format it in a clear, readable way for the user."""
         if not context_data:
             return "I can help you with cybersecurity training questions. What would you like to know?"
         
-        # Format context data into readable response with better formatting
-        response_parts = []
+        # Format context data into readable response with better formatting.
+        # Every line is written with a trailing newline into one buffer.
+        buf = io.StringIO()
+        w = buf.write
         
         if "employee_name" in context_data:
-            response_parts.append(f"**Training Status for {context_data['employee_name']}**\n")
+            w(f"**Training Status for {context_data['employee_name']}**\n\n")
         
-        if "status" in context_data:
-            response_parts.append(f"Status: **{context_data['status']}**")
+        if "training_completed" in context_data:
+            w("Training complete: **Yes**\n" if context_data['training_completed'] else "Training complete: **No**\n")
         
-        if "completion_percentage" in context_data:
-            response_parts.append(f"Completion: **{context_data['completion_percentage']}%**")
+        for key, prefix, suffix in self._MOCK_SUMMARY_FIELDS:
+            if key in context_data:
+                w(prefix)
+                w(str(context_data[key]))
+                w(suffix)
         
         if "completed_videos" in context_data:
             completed = context_data['completed_videos']
             if completed:
-                response_parts.append(f"\n**Completed Videos:** {len(completed)} out of 5")
-                response_parts.append(f"Video numbers: {completed}")
+                w(f"\n**Completed Videos:** {len(completed)} out of 5\n")
+                w(f"Video numbers: {completed}\n")
         
         if "missing_videos" in context_data:
             missing = context_data['missing_videos']
             if missing:
-                response_parts.append(f"\n**Missing Videos:** {len(missing)}")
-                response_parts.append(f"Video numbers: {missing}")
+                w(f"\n**Missing Videos:** {len(missing)}\n")
+                w(f"Video numbers: {missing}\n")
         
         if "total_time_minutes" in context_data:
-            time_min = context_data['total_time_minutes']
-            response_parts.append(f"\n**Total Time Spent:** {time_min} minutes")
+            w(f"\n**Total Time Spent:** {context_data['total_time_minutes']} minutes\n")
         
         if "video_details" in context_data:
-            response_parts.append("\n**Detailed Video Status:**")
+            w("\n**Detailed Video Status:**\n")
             for video in context_data['video_details']:
                 status_icon = "✅" if video.get('completed') else "❌"
-                response_parts.append(
-                    f"{status_icon} Video {video['video_number']}: {video['video_name']} ({video['duration_minutes']} min)"
-                )
+                w(f"{status_icon} Video {video['video_number']}: {video['video_name']} ({video['duration_minutes']} min)\n")
+        
+        if "video" in context_data:
+            video = context_data['video']
+            status_icon = "✅" if video.get('completed') else "❌"
+            w(f"{status_icon} Video {video['video_number']}: {video['video_name']} ({video['duration_minutes']} min)\n")
+        
+        if "all_videos" in context_data:
+            w("\n**Video Durations:**\n")
+            total_time = 0
+            for video in context_data['all_videos']:
+                status_icon = "✅" if video.get('completed') else "❌"
+                w(f"{status_icon} Video {video['video_number']}: {video['video_name']} ({video['duration_minutes']} min)\n")
+                total_time += video['duration_minutes']
+            w(f"\n**Total Time Spent:** {total_time} minutes\n")
+        
+        # Employee list formatting (CISO filters)
+        if "filter" in context_data:
+            w(f"Completed videos: **{context_data['filter']}**\n")
+        
+        if "employees" in context_data:
+            employees = context_data['employees']
+            w(f"\n**Employees:** {len(employees)}\n")
+            for employee in employees:
+                w(f"- {employee['employee_name']} ({employee['department']}): {employee['completion_percentage']}%\n")
         
         # Global summary formatting
         if "total_employees" in context_data:
-            response_parts.append("\n**Company-wide Training Statistics:**\n")
-            response_parts.append(f"📊 Total Employees: {context_data['total_employees']}")
-            response_parts.append(f"✅ Finished: {context_data.get('finished_employees_count', 0)}")
-            response_parts.append(f"🔄 In Progress: {context_data.get('in_progress_count', 0)}")
-            response_parts.append(f"⏸️  Not Started: {context_data.get('not_started_count', 0)}")
+            w("\n**Company-wide Training Statistics:**\n\n")
+            w(f"📊 Total Employees: {context_data['total_employees']}\n")
+            w(f"✅ Finished: {context_data.get('finished_employees_count', 0)}\n")
+            w(f"🔄 In Progress: {context_data.get('in_progress_count', 0)}\n")
+            w(f"⏸️  Not Started: {context_data.get('not_started_count', 0)}\n")
             
             if context_data.get('average_time_minutes'):
-                response_parts.append(f"\n⏱️  **Completion Times:**")
-                response_parts.append(f"Average: {context_data['average_time_minutes']} minutes")
-                response_parts.append(f"Minimum: {context_data['min_time_minutes']} minutes")
-                response_parts.append(f"Maximum: {context_data['max_time_minutes']} minutes")
+                w("\n⏱️  **Completion Times:**\n")
+                w(f"Average: {context_data['average_time_minutes']} minutes\n")
+                w(f"Minimum: {context_data['min_time_minutes']} minutes\n")
+                w(f"Maximum: {context_data['max_time_minutes']} minutes\n")
                 
                 if context_data.get('fastest_employee'):
                     fastest = context_data['fastest_employee']
-                    response_parts.append(f"\n🚀 Fastest: {fastest['name']} ({fastest['time_minutes']} min)")
+                    w(f"\n🚀 Fastest: {fastest['name']} ({fastest['time_minutes']} min)\n")
                 
                 if context_data.get('slowest_employee'):
                     slowest = context_data['slowest_employee']
-                    response_parts.append(f"🐢 Slowest: {slowest['name']} ({slowest['time_minutes']} min)")
+                    w(f"🐢 Slowest: {slowest['name']} ({slowest['time_minutes']} min)\n")
         
-        if response_parts:
-            return "\n".join(response_parts)
+        if buf.tell():
+            # Drop the last line's newline
+            return buf.getvalue()[:-1]
         else:
             return self._format_context_data(context_data)
     
@@ -218,19 +521,23 @@ When given data, format it in a clear, readable way for the user."""
         Returns:
             Formatted string
         """
-        lines = []
+        buf = io.StringIO()
+        w = buf.write
         for key, value in data.items():
+            w(key)
             if isinstance(value, list):
-                lines.append(f"{key}: {', '.join(map(str, value))}")
+                w(": ")
+                w(", ".join(map(str, value)))
+                w("\n")
             elif isinstance(value, dict):
-                lines.append(f"{key}:")
+                w(":\n")
                 for k, v in value.items():
-                    lines.append(f"  - {k}: {v}")
+                    w(f"  - {k}: {v}\n")
             else:
-                lines.append(f"{key}: {value}")
-        return "\n".join(lines)
+                w(f": {value}\n")
+        return buf.getvalue()[:-1]
     
-    def process_query(
+    async def process_query(
         self,
         query: str,
         session_id: str
@@ -245,6 +552,156 @@ When given data, format it in a clear, readable way for the user."""
         Returns:
             Response dictionary with answer and metadata
         """
+        result, pending = await self._prepare_query(query, session_id)
+        if result is not None:
+            return result
+        
+        cache_key, intent, context_data = pending
+        
+        # Step 7: Generate response using LLM
+        llm_response, fell_back = await self._call_llm(query, context_data, intent)
+        
+        # Step 8: Sanitize response
+        safe_response = Guardrails.sanitize_response(llm_response)
+        
+        return self._finish_query(
+            cache_key, intent, context_data, safe_response, cache=not fell_back
+        )
+    
+    async def process_query_stream(
+        self,
+        query: str,
+        session_id: str
+    ) -> AsyncIterator[Dict]:
+        """
+        Process a user query, streaming the answer as it is generated.
+        
+        Validation, authentication and data retrieval finish before this
+        returns; only LLM generation is deferred to iteration.
+        
+        Args:
+            query: User's natural language question
+            session_id: Session identifier
+            
+        Returns:
+            Async iterator of events: {"delta": text} pieces of the answer,
+            then a final {"done": True, ...} event with the response metadata
+        """
+        result, pending = await self._prepare_query(query, session_id)
+        if result is not None:
+            return self._stream_result(result)
+        return self._stream_answer(query, *pending)
+    
+    async def _stream_result(self, result: Dict) -> AsyncIterator[Dict]:
+        """
+        Stream an already complete result as a single delta.
+        
+        Args:
+            result: Response dictionary from the pipeline
+            
+        Yields:
+            Stream events
+        """
+        yield {"delta": result["response"]}
+        yield self._done_event(result)
+    
+    async def _stream_answer(
+        self,
+        query: str,
+        cache_key: Tuple,
+        intent: Intent,
+        context_data: Dict
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream the sanitized LLM answer, then cache the full result.
+        
+        If the LLM stream fails before any output, the rule-based response is
+        streamed instead and not cached. If it fails midway, the final event
+        reports the answer as incomplete and nothing is cached.
+        
+        Args:
+            query: User's natural language question
+            cache_key: Response cache key for this query
+            intent: Parsed intent
+            context_data: Retrieved context data
+            
+        Yields:
+            Stream events
+        """
+        sanitizer = ResponseStreamSanitizer()
+        response_parts = []
+        has_output = False
+        fell_back = False
+        
+        try:
+            async for chunk in self._stream_llm(query, context_data, intent):
+                has_output = True
+                delta = sanitizer.feed(chunk)
+                if delta:
+                    response_parts.append(delta)
+                    yield {"delta": delta}
+        except Exception:
+            # Already logged by _stream_llm
+            if has_output:
+                # Part of the answer was sent: report it as incomplete
+                yield {
+                    "done": True,
+                    "success": False,
+                    "error": "The response was interrupted. Please try again.",
+                    "intent": intent.value,
+                    "requires_auth": False
+                }
+                return
+            
+            # Nothing was sent yet: fall back to the rule-based response
+            fell_back = True
+            delta = sanitizer.feed(self._mock_response(query, context_data))
+            if delta:
+                response_parts.append(delta)
+                yield {"delta": delta}
+        
+        delta = sanitizer.finish()
+        if delta:
+            response_parts.append(delta)
+            yield {"delta": delta}
+        
+        result = self._finish_query(
+            cache_key, intent, context_data, "".join(response_parts), cache=not fell_back
+        )
+        yield self._done_event(result)
+    
+    @staticmethod
+    def _done_event(result: Dict) -> Dict:
+        """
+        Build the final stream event from a response dictionary.
+        
+        Args:
+            result: Response dictionary from the pipeline
+            
+        Returns:
+            Result metadata without the (already streamed) response text
+        """
+        event = {key: value for key, value in result.items() if key != "response"}
+        event["done"] = True
+        return event
+    
+    async def _prepare_query(
+        self,
+        query: str,
+        session_id: str
+    ) -> Tuple[Optional[Dict], Optional[Tuple]]:
+        """
+        Run the pipeline steps that come before response generation.
+        
+        Args:
+            query: User's natural language question
+            session_id: Session identifier
+            
+        Returns:
+            Tuple of (result, pending). result is the final response when the
+            query is answered without the LLM (rejected, unauthenticated or
+            cached); otherwise pending is (cache_key, intent, context_data).
+        """
         # Step 1: Validate query through guardrails
         is_valid, error_message = Guardrails.validate_query(query)
         if not is_valid:
@@ -252,22 +709,23 @@ When given data, format it in a clear, readable way for the user."""
                 "success": False,
                 "response": error_message,
                 "requires_auth": False
-            }
+            }, None
         
         # Step 2: Check authentication
-        if not self.auth_service.is_authenticated(session_id):
+        session_info = self.auth_service.get_session_info(session_id)
+        if not session_info.is_authenticated:
             return {
                 "success": False,
                 "response": "Please authenticate with your employee ID and name first.",
                 "requires_auth": True
-            }
+            }, None
         
         # Step 3: Parse intent
         parsed = IntentParser.parse(query)
         intent = parsed["intent"]
         
         # Step 4: Check if CISO query
-        is_ciso = self.auth_service.is_ciso(session_id)
+        is_ciso = session_info.is_ciso
         is_ciso_query = IntentParser.is_ciso_query(query)
         
         if is_ciso_query and not is_ciso:
@@ -275,33 +733,106 @@ When given data, format it in a clear, readable way for the user."""
                 "success": False,
                 "response": "You don't have permission to access company-wide statistics. CISO access required.",
                 "requires_auth": False
-            }
+            }, None
         
         # Step 5: Get employee ID
-        employee_id = self.auth_service.get_authenticated_employee_id(session_id)
+        employee_id = session_info.employee_id
         
-        # Step 6: Retrieve relevant data based on intent
-        context_data = self._get_context_data(intent, parsed, employee_id, is_ciso)
+        # Check if CISO is asking about a specific employee
+        # (the database session is synchronous, so keep it off the event loop)
+        target_employee_id = employee_id
+        employee_name = parsed["employee_name"]
+        if is_ciso and employee_name:
+            target_employee_id = await run_in_threadpool(
+                self._find_employee_id, employee_name
+            )
+        
+        # Repeated question from the same user: skip data retrieval and LLM
+        cache_key = response_cache.make_key(
+            query, parsed, employee_id, is_ciso, target_employee_id
+        )
+        cached_result = response_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result, None
         
-        # Step 7: Generate response using LLM
-        llm_response = self._call_llm(query, context_data)
+        # Step 6: Retrieve relevant data based on intent
+        context_data = await run_in_threadpool(
+            self._get_context_data, intent, parsed, target_employee_id, is_ciso
+        )
         
-        # Step 8: Sanitize response
-        safe_response = Guardrails.sanitize_response(llm_response)
+        return None, (cache_key, intent, context_data)
+    
+    def _finish_query(
+        self,
+        cache_key: Tuple,
+        intent: Intent,
+        context_data: Dict,
+        safe_response: str,
+        cache: bool = True
+    ) -> Dict:
+        """
+        Build the final response dictionary and cache it.
         
-        return {
+        Args:
+            cache_key: Response cache key for this query
+            intent: Parsed intent
+            context_data: Retrieved context data
+            safe_response: Sanitized response text
+            cache: Whether to cache the result; False for the rule-based
+                fallback after an LLM error, so the LLM answers again once
+                the provider recovers
+            
+        Returns:
+            Response dictionary with answer and metadata
+        """
+        result = {
             "success": True,
             "response": safe_response,
             "intent": intent.value,
             "context_data": context_data,
             "requires_auth": False
         }
+        if cache:
+            response_cache.set(cache_key, result)
+        
+        return result
+    
+    def _get_status(self, employee_id: int) -> Dict:
+        """
+        Get employee status, fetching it at most once per agent.
+        
+        Args:
+            employee_id: Employee ID
+            
+        Returns:
+            Employee status dictionary
+        """
+        status = self._status_cache.get(employee_id)
+        if status is None:
+            status = self.training_service.get_employee_status(employee_id)
+            self._status_cache[employee_id] = status
+        return status
+    
+    def _find_employee_id(self, employee_name: str) -> Optional[int]:
+        """
+        Look up an employee by name for a CISO query.
+        
+        Args:
+            employee_name: Employee name extracted from the query
+            
+        Returns:
+            Employee ID, or None if no employee has that name
+        """
+        employee = self.training_service.get_employee_by_name(employee_name)
+        if employee:
+            return int(employee.EMPLOYEE_ID)
+        return None
     
     def _get_context_data(
         self,
         intent: Intent,
         parsed: Dict,
-        employee_id: int,
+        target_employee_id: Optional[int],
         is_ciso: bool
     ) -> Dict:
         """
@@ -310,29 +841,21 @@ When given data, format it in a clear, readable way for the user."""
         Args:
             intent: Parsed intent
             parsed: Full parsed query data
-            employee_id: Employee ID (logged-in user)
+            target_employee_id: Employee the query is about (the logged-in
+                user, or the employee a CISO named; None if not found)
             is_ciso: Whether user is CISO
             
         Returns:
             Context data dictionary
         """
-        # Check if CISO is asking about a specific employee
-        target_employee_id = employee_id
-        employee_name = parsed.get("employee_name")
-        
-        if is_ciso and employee_name:
-            # CISO asking about another employee - look them up by name
-            employee = self.training_service.get_employee_by_name(employee_name)
-            if employee:
-                target_employee_id = int(employee.EMPLOYEE_ID)
-            else:
-                return {"error": f"Employee '{employee_name}' not found in database"}
+        if target_employee_id is None:
+            return {"error": f"Employee '{parsed['employee_name']}' not found in database"}
         
         if intent == Intent.EMPLOYEE_STATUS:
-            return self.training_service.get_employee_status(target_employee_id)
+            return self._get_status(target_employee_id)
         
         elif intent == Intent.CHECK_COMPLETION:
-            status = self.training_service.get_employee_status(target_employee_id)
+            status = self._get_status(target_employee_id)
             return {
                 "training_completed": status["status"] == "FINISHED",
                 "completion_percentage": status["completion_percentage"],
@@ -341,7 +864,7 @@ When given data, format it in a clear, readable way for the user."""
             }
         
         elif intent == Intent.LIST_COMPLETED_VIDEOS:
-            status = self.training_service.get_employee_status(target_employee_id)
+            status = self._get_status(target_employee_id)
             return {
                 "completed_videos": status["completed_videos"],
                 "video_details": [
@@ -350,7 +873,7 @@ When given data, format it in a clear, readable way for the user."""
             }
         
         elif intent == Intent.LIST_MISSING_VIDEOS:
-            status = self.training_service.get_employee_status(target_employee_id)
+            status = self._get_status(target_employee_id)
             return {
                 "missing_videos": status["missing_videos"],
                 "video_details": [
@@ -360,13 +883,13 @@ When given data, format it in a clear, readable way for the user."""
         
         elif intent == Intent.VIDEO_DURATION:
             video_num = parsed["video_number"]
-            status = self.training_service.get_employee_status(target_employee_id)
+            status = self._get_status(target_employee_id)
             if video_num:
-                video_detail = next(
-                    (v for v in status["video_details"] if v["video_number"] == video_num),
-                    None
-                )
-                return {"video": video_detail} if video_detail else {}
+                # video_details is ordered by video number, starting at 1
+                video_details = status["video_details"]
+                if 1 <= video_num <= len(video_details):
+                    return {"video": video_details[video_num - 1]}
+                return {}
             return {"all_videos": status["video_details"]}
         
         elif intent == Intent.GLOBAL_SUMMARY and is_ciso:
@@ -398,5 +921,5 @@ When given data, format it in a clear, readable way for the user."""
         
         else:
             # General question - return full employee status
-            return self.training_service.get_employee_status(target_employee_id)
+            return self._get_status(target_employee_id)
 
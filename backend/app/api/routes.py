@@ -7,10 +7,13 @@ Implements all required API functionality with proper error handling.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import AsyncIterator, Dict
+import logging
+import orjson
 
-from app.db.session import get_db
+from app.db.session import engine, get_db
 from app.services.auth_service import AuthService
 from app.services.training_service import TrainingService
 from app.agents.training_agent import TrainingAgent
@@ -27,9 +30,24 @@ from app.api.schemas import (
 )
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
+def get_agent(db: Session = Depends(get_db)) -> TrainingAgent:
+    """
+    Provide a training agent bound to the request's database session.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Training agent using the shared LLM client
+    """
+    return TrainingAgent(db)
+
+
 @router.post("/session/create", response_model=SessionCreateResponse)
 def create_session(db: Session = Depends(get_db)) -> SessionCreateResponse:
     """
@@ -89,9 +107,9 @@ def authenticate(
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    agent: TrainingAgent = Depends(get_agent)
 ) -> ChatResponse:
     """
     Process a natural language query about training.
@@ -105,14 +123,13 @@ def chat(
     
     Args:
         request: Chat request with query and session_id
-        db: Database session
+        agent: Training agent for this request
         
     Returns:
         AI-generated response with context data
     """
     try:
-        agent = TrainingAgent(db)
-        result = agent.process_query(request.query, request.session_id)
+        result = await agent.process_query(request.query, request.session_id)
         
         return ChatResponse(
             success=result["success"],
@@ -122,7 +139,8 @@ def chat(
             context_data=result.get("context_data")
         )
     
-    except Exception as e:
+    except Exception:
+        logger.exception("Chat request failed")
         return ChatResponse(
             success=False,
             response=f"An error occurred while processing your query. Please try again.",
@@ -130,6 +148,54 @@ def chat(
         )
 
 
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    agent: TrainingAgent = Depends(get_agent)
+) -> StreamingResponse:
+    """
+    Process a natural language query, streaming the answer as it is generated.
+    
+    Runs the same pipeline as /chat and responds with Server-Sent Events:
+    one ``{"delta": ...}`` event per piece of the answer, followed by a
+    ``{"done": true, ...}`` event carrying the same metadata as ChatResponse.
+    If generation fails midway, the done event has ``success: false`` and an
+    ``error`` message: the streamed text is incomplete.
+    
+    Args:
+        request: Chat request with query and session_id
+        agent: Training agent for this request
+        
+    Returns:
+        Event stream of the AI-generated response
+    """
+    error_event = {
+        "done": True,
+        "success": False,
+        "response": "An error occurred while processing your query. Please try again.",
+        "requires_auth": False
+    }
+    
+    try:
+        events = await agent.process_query_stream(request.query, request.session_id)
+    except Exception:
+        logger.exception("Streamed chat request failed")
+        events = None
+    
+    async def event_stream() -> AsyncIterator[bytes]:
+        if events is None:
+            yield b"data: " + orjson.dumps(error_event) + b"\n\n"
+            return
+        try:
+            async for event in events:
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception:
+            logger.exception("Streamed chat response failed")
+            yield b"data: " + orjson.dumps(error_event) + b"\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.post("/status/employee", response_model=EmployeeStatusResponse)
 def get_employee_status(
     request: EmployeeStatusRequest,
@@ -153,7 +219,8 @@ def get_employee_status(
         training_service = TrainingService(db)
         
         # Check authentication
-        if not auth_service.is_authenticated(request.session_id):
+        session_info = auth_service.get_session_info(request.session_id)
+        if not session_info.is_authenticated:
             return EmployeeStatusResponse(
                 success=False,
                 error="Not authenticated. Please authenticate first."
@@ -162,7 +229,7 @@ def get_employee_status(
         # Determine which employee to query
         if request.employee_id:
             # CISO querying specific employee
-            if not auth_service.is_ciso(request.session_id):
+            if not session_info.is_ciso:
                 return EmployeeStatusResponse(
                     success=False,
                     error="You don't have permission to view other employees' status."
@@ -170,7 +237,7 @@ def get_employee_status(
             employee_id = request.employee_id
         else:
             # User querying their own status
-            employee_id = auth_service.get_authenticated_employee_id(request.session_id)
+            employee_id = session_info.employee_id
         
         # Get status
         status_data = training_service.get_employee_status(employee_id)
@@ -186,7 +253,8 @@ def get_employee_status(
             data=status_data
         )
     
-    except Exception as e:
+    except Exception:
+        logger.exception("Employee status request failed")
         return EmployeeStatusResponse(
             success=False,
             error="An error occurred while retrieving status."
@@ -217,14 +285,15 @@ def get_global_status(
         training_service = TrainingService(db)
         
         # Check authentication
-        if not auth_service.is_authenticated(request.session_id):
+        session_info = auth_service.get_session_info(request.session_id)
+        if not session_info.is_authenticated:
             return GlobalStatusResponse(
                 success=False,
                 error="Not authenticated. Please authenticate first."
             )
         
         # Check CISO permission
-        if not auth_service.is_ciso(request.session_id):
+        if not session_info.is_ciso:
             return GlobalStatusResponse(
                 success=False,
                 error="CISO access required for global statistics."
@@ -256,7 +325,8 @@ def get_global_status(
             data=data
         )
     
-    except Exception as e:
+    except Exception:
+        logger.exception("Global status request failed")
         return GlobalStatusResponse(
             success=False,
             error="An error occurred while retrieving global statistics."
@@ -269,11 +339,12 @@ def health_check() -> Dict:
     Health check endpoint.
     
     Returns:
-        Service status
+        Service status and database connection pool usage
     """
     return {
         "status": "healthy",
         "service": "CyberSecurity Training Assistant",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "db_pool": engine.pool.status()
     }
 
@@ -1,5 +1,5 @@
 """Core module for configuration and utilities"""
-from .config import settings
+from .config import get_settings, settings
 
-__all__ = ["settings"]
+__all__ = ["get_settings", "settings"]
 
@@ -0,0 +1,81 @@
+"""
+Cache Module
+~~~~~~~~~~~~
+
+Bounded in-memory TTL cache shared by the agent and the services.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded TTL cache.
+    
+    Entries expire after the configured TTL and the least recently used
+    entry is evicted once the cache is full. Like the session store this
+    lives in process memory; multiple backend instances each keep their own.
+    Access is locked, so one cache can be shared by worker threads.
+    """
+    
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        """
+        Initialize cache.
+        
+        Args:
+            ttl_seconds: Entry lifetime in seconds (0 disables caching)
+            max_entries: Maximum number of cached entries
+        """
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value if present and fresh, None otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self._ttl:
+                # Remove expired entry
+                self._entries.pop(key, None)
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Dict) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key
+            value: Dictionary to cache
+        """
+        if self._ttl <= 0:
+            return
+        
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
@@ -6,8 +6,9 @@ Manages application configuration using Pydantic Settings.
 Loads environment variables and provides type-safe configuration access.
 """
 
-from typing import List
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from typing import Tuple
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
 
@@ -23,6 +24,22 @@ class Settings(BaseSettings):
         default="sqlite:///./employees.db",
         description="Database connection URL"
     )
+    db_pool_size: int = Field(
+        default=10,
+        description="Connections kept open in the database pool"
+    )
+    db_max_overflow: int = Field(
+        default=10,
+        description="Extra connections allowed above the pool size under load"
+    )
+    db_pool_recycle_seconds: int = Field(
+        default=1800,
+        description="Reconnect pooled connections older than this many seconds"
+    )
+    auto_create_tables: bool = Field(
+        default=False,
+        description="Create missing tables and indexes on startup (required on first start and after index changes)"
+    )
     
     # LLM Configuration
     openai_api_key: str = Field(default="", description="OpenAI API key")
@@ -63,8 +80,8 @@ class Settings(BaseSettings):
     )
     
     # CORS Configuration
-    allowed_origins: List[str] = Field(
-        default=["http://localhost:3000", "http://localhost:5173"],
+    allowed_origins: Tuple[str, ...] = Field(
+        default=("http://localhost:3000", "http://localhost:5173"),
         description="Allowed CORS origins"
     )
     
@@ -74,13 +91,47 @@ class Settings(BaseSettings):
         description="Session timeout in minutes"
     )
     
-    class Config:
-        """Pydantic configuration"""
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    # Response Cache Configuration
+    response_cache_ttl_seconds: int = Field(
+        default=300,
+        description="Chat response cache TTL in seconds (0 disables caching)"
+    )
+    response_cache_max_entries: int = Field(
+        default=10_000,
+        description="Maximum number of cached chat responses"
+    )
+    status_cache_ttl_seconds: int = Field(
+        default=30,
+        description="Employee status cache TTL in seconds (0 disables caching)"
+    )
+    status_cache_max_entries: int = Field(
+        default=4096,
+        description="Maximum number of cached employee status snapshots"
+    )
+    
+    # Settings are read once at startup and never change afterwards
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        frozen=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings.
+    
+    The environment and .env file are read and validated once; later calls
+    return the same instance.
+    
+    Returns:
+        Settings instance
+    """
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 
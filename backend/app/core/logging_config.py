@@ -0,0 +1,60 @@
+"""
+Logging Configuration Module
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Configures application logging.
+Request handlers only enqueue log records; a background listener thread
+writes them out, so a burst of errors (e.g. during an LLM provider
+outage) never blocks requests on console I/O.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+# Background listener writing queued records, while logging is configured
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = "INFO") -> None:
+    """
+    Route all log records through a queue to a background writer.
+    
+    Calling it again while logging is configured only updates the level.
+    
+    Args:
+        level: Root logging level name (e.g. "INFO")
+    """
+    global _listener
+    
+    root = logging.getLogger()
+    root.setLevel(level.upper())
+    if _listener is not None:
+        return
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, console, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the queue handler"""
+    global _listener
+    
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    _listener = None
@@ -8,16 +8,46 @@ Provides dependency injection for FastAPI endpoints.
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import StaticPool
+from typing import Any, Dict, Generator
 from app.core.config import settings
 
 
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Build connection pool options for a database URL.
+    
+    Args:
+        database_url: SQLAlchemy database URL
+        
+    Returns:
+        Keyword arguments for create_engine
+    """
+    pool_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        # Reuse the most recently returned connection, letting idle ones expire
+        "pool_use_lifo": True,
+    }
+    
+    if database_url.startswith("sqlite"):
+        # For SQLite, we need check_same_thread=False to allow multiple threads
+        connect_args = {"check_same_thread": False}
+        if database_url in ("sqlite://", "sqlite:///:memory:"):
+            # An in-memory database exists per connection: share a single one
+            return {"connect_args": connect_args, "poolclass": StaticPool}
+        return {"connect_args": connect_args, **pool_options}
+    
+    # Networked databases: detect connections dropped by the server
+    return {"pool_pre_ping": True, **pool_options}
+
+
 # Create SQLAlchemy engine
-# For SQLite, we need check_same_thread=False to allow multiple threads
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
     echo=settings.debug,  # Log SQL queries in debug mode
+    **_engine_options(settings.database_url),
 )
 
 # Create session factory
@@ -6,10 +6,13 @@ FastAPI application setup with middleware, CORS, and route registration.
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from sqlalchemy.schema import CreateIndex
 
 from app.core.config import settings
+from app.core.logging_config import setup_logging, shutdown_logging
 from app.db.session import engine
 from app.db.base import Base
 # Import models FIRST before anything else
@@ -25,18 +28,29 @@ async def lifespan(app: FastAPI):
     
     Handles startup and shutdown events.
     """
-    # Startup: Create tables if they don't exist
-    # Note: In production, use Alembic for migrations
-    try:
-        Base.metadata.create_all(bind=engine)
-        print("✅ Database tables verified/created")
-    except Exception as e:
-        print(f"⚠️  Database initialization warning: {e}")
+    setup_logging(settings.log_level)
+    
+    # Startup: Create missing tables and indexes (opt-in; checking the
+    # schema costs round-trips before the first request is served)
+    if settings.auto_create_tables:
+        try:
+            Base.metadata.create_all(bind=engine)
+            # create_all skips tables that already exist together with their
+            # indexes, so add indexes defined after a table was created
+            # (IF NOT EXISTS: SQLite cannot reflect expression indexes)
+            with engine.begin() as connection:
+                for table in Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        connection.execute(CreateIndex(index, if_not_exists=True))
+            print("✅ Database tables and indexes verified/created")
+        except Exception as e:
+            print(f"⚠️  Database initialization warning: {e}")
     
     yield
     
     # Shutdown: cleanup if needed
     print("👋 Application shutting down")
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -45,6 +59,8 @@ app = FastAPI(
     version=settings.app_version,
     description="AI-powered cybersecurity training assistant with natural language processing",
     lifespan=lifespan,
+    # Serialize response bodies with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
@@ -52,7 +68,8 @@ app = FastAPI(
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins,
+    # Origins are membership-tested on every request
+    allow_origins=frozenset(settings.allowed_origins),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -79,6 +96,9 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.debug
+        reload=settings.debug,
+        # Installed by uvicorn[standard]; fail loudly rather than fall back
+        loop="uvloop",
+        http="httptools"
     )
 
@@ -3,12 +3,67 @@ Real Employee Model - Matches Actual Database Schema
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 """
 
-from sqlalchemy import Column, String, DateTime
+import operator
+from sqlalchemy import Column, String, DateTime, Index, case, func, literal_column
 from sqlalchemy.ext.hybrid import hybrid_property
 from datetime import datetime
+from functools import cached_property, reduce
+from typing import Optional, Tuple
 from app.db.base import Base
 
 
+# Start/finish column names per video, indexed by video number - 1
+_START = (
+    "START_FIRST_VIDEO_DATE",
+    "START_SECOND_VIDEO_DATE",
+    "START_THIRD_VIDEO_DATE",
+    "START_FOURTH_VIDEO_DATE",
+)
+_FINISH = (
+    "FINISH_FIRST_VIDEO_DATE",
+    "FINISH_SECOND_VIDEO_DATE",
+    "FINISH_THIRD_VIDEO_DATE",
+    "FINISH_FOURTH_VIDEO_DATE",
+)
+
+# Training status by number of finished videos (0-4)
+_STATUS_BY_COUNT = ("NOT_STARTED", "IN_PROGRESS", "IN_PROGRESS", "IN_PROGRESS", "FINISHED")
+
+
+def employee_email(first_name: str, last_name: str) -> str:
+    """
+    Company email address for an employee.
+    
+    Args:
+        first_name: Employee first name
+        last_name: Employee last name
+        
+    Returns:
+        Email address in first.last@company.com form
+    """
+    return f"{first_name.lower()}.{last_name.lower()}@company.com"
+
+
+def video_duration_minutes(start: Optional[datetime], finish: Optional[datetime]) -> float:
+    """
+    Time spent on one video, in minutes rounded to 2 decimals.
+    
+    Shared by Employee and by queries that read the date columns directly,
+    so both report identical durations.
+    
+    Args:
+        start: Video start date
+        finish: Video finish date
+        
+    Returns:
+        Minutes between start and finish, or 0.0 unless both are set
+    """
+    if start and finish:
+        delta = finish - start
+        return round(delta.total_seconds() / 60, 2)
+    return 0.0
+
+
 class Employee(Base):
     """
     Employee ORM model for the REAL database schema.
@@ -49,6 +104,13 @@ class Employee(Base):
         """Get full name"""
         return f"{self.EMPLOYEE_NAME} {self.EMPLOYEE_LAST_NAME}"
     
+    @full_name.expression
+    def full_name(cls):
+        """SQL: first and last name joined by a space"""
+        # Literal separator (not a bound parameter) so queries match the
+        # expression index below
+        return cls.EMPLOYEE_NAME + literal_column("' '") + cls.EMPLOYEE_LAST_NAME
+    
     @hybrid_property
     def id(self) -> str:
         """Alias for EMPLOYEE_ID"""
@@ -67,56 +129,81 @@ class Employee(Base):
     @hybrid_property
     def email(self) -> str:
         """Generate email from name"""
-        return f"{self.EMPLOYEE_NAME.lower()}.{self.EMPLOYEE_LAST_NAME.lower()}@company.com"
+        return employee_email(self.EMPLOYEE_NAME, self.EMPLOYEE_LAST_NAME)
+    
+    @cached_property
+    def _completed_mask(self) -> Tuple[bool, ...]:
+        """
+        Completion flag per video (index 0 is video 1).
+        
+        Status, percentage and video lists are all derived from these flags;
+        computing them once per instance avoids re-reading the four finish
+        columns for every derived value. Data is read-only, so the cached
+        flags never go stale.
+        """
+        return tuple(getattr(self, column) is not None for column in _FINISH)
     
     def get_video_completed(self, video_num: int) -> bool:
         """Check if a video is completed"""
-        video_map = {
-            1: self.FINISH_FIRST_VIDEO_DATE,
-            2: self.FINISH_SECOND_VIDEO_DATE,
-            3: self.FINISH_THIRD_VIDEO_DATE,
-            4: self.FINISH_FOURTH_VIDEO_DATE,
-        }
-        finish_date = video_map.get(video_num)
-        return finish_date is not None
+        return 1 <= video_num <= 4 and self._completed_mask[video_num - 1]
     
     def get_video_duration(self, video_num: int) -> float:
         """Calculate video duration in minutes"""
-        video_map = {
-            1: (self.START_FIRST_VIDEO_DATE, self.FINISH_FIRST_VIDEO_DATE),
-            2: (self.START_SECOND_VIDEO_DATE, self.FINISH_SECOND_VIDEO_DATE),
-            3: (self.START_THIRD_VIDEO_DATE, self.FINISH_THIRD_VIDEO_DATE),
-            4: (self.START_FOURTH_VIDEO_DATE, self.FINISH_FOURTH_VIDEO_DATE),
-        }
-        start, finish = video_map.get(video_num, (None, None))
-        if start and finish:
-            delta = finish - start
-            return round(delta.total_seconds() / 60, 2)
-        return 0.0
+        if not 1 <= video_num <= 4:
+            return 0.0
+        return video_duration_minutes(
+            getattr(self, _START[video_num - 1]),
+            getattr(self, _FINISH[video_num - 1])
+        )
     
     def get_completed_videos(self) -> list[int]:
         """Get list of completed video numbers"""
-        return [i for i in range(1, 5) if self.get_video_completed(i)]
+        return [i + 1 for i, done in enumerate(self._completed_mask) if done]
     
     def get_missing_videos(self) -> list[int]:
         """Get list of missing video numbers"""
-        return [i for i in range(1, 5) if not self.get_video_completed(i)]
+        return [i + 1 for i, done in enumerate(self._completed_mask) if not done]
     
     def get_training_status(self) -> str:
         """Get training status"""
-        completed = self.get_completed_videos()
-        if len(completed) == 0:
-            return "NOT_STARTED"
-        elif len(completed) == 4:
-            return "FINISHED"
-        else:
-            return "IN_PROGRESS"
+        return _STATUS_BY_COUNT[sum(self._completed_mask)]
+    
+    @hybrid_property
+    def completed_videos_count(self) -> int:
+        """Number of finished videos"""
+        return sum(self._completed_mask)
+    
+    @completed_videos_count.expression
+    def completed_videos_count(cls):
+        """SQL: number of non-NULL finish dates"""
+        return reduce(operator.add, (
+            case((getattr(cls, column).isnot(None), 1), else_=0) for column in _FINISH
+        ))
+    
+    @hybrid_property
+    def training_status(self) -> str:
+        """Training status: NOT_STARTED, IN_PROGRESS or FINISHED"""
+        return self.get_training_status()
+    
+    @training_status.expression
+    def training_status(cls):
+        """SQL: training status derived from the finished-video count"""
+        completed = cls.completed_videos_count
+        return case(
+            (completed == 0, "NOT_STARTED"),
+            (completed == 4, "FINISHED"),
+            else_="IN_PROGRESS",
+        )
     
     @hybrid_property
     def completion_percentage(self) -> float:
         """Calculate completion percentage"""
-        completed = len(self.get_completed_videos())
-        return round((completed / 4) * 100, 2)
+        return sum(self._completed_mask) * 25.0
+    
+    @completion_percentage.expression
+    def completion_percentage(cls):
+        """SQL: completion percentage from the finished-video count"""
+        return cls.completed_videos_count * 25.0
     
     @hybrid_property
     def total_time(self) -> float:
@@ -126,12 +213,7 @@ class Employee(Base):
     @hybrid_property
     def started_at(self) -> datetime:
         """Get earliest start date"""
-        dates = [
-            self.START_FIRST_VIDEO_DATE,
-            self.START_SECOND_VIDEO_DATE,
-            self.START_THIRD_VIDEO_DATE,
-            self.START_FOURTH_VIDEO_DATE,
-        ]
+        dates = [getattr(self, column) for column in _START]
         valid_dates = [d for d in dates if d]
         return min(valid_dates) if valid_dates else None
     
@@ -139,13 +221,12 @@ class Employee(Base):
     def completed_at(self) -> datetime:
         """Get completion date if all videos finished"""
         if self.get_training_status() == "FINISHED":
-            dates = [
-                self.FINISH_FIRST_VIDEO_DATE,
-                self.FINISH_SECOND_VIDEO_DATE,
-                self.FINISH_THIRD_VIDEO_DATE,
-                self.FINISH_FOURTH_VIDEO_DATE,
-            ]
+            dates = [getattr(self, column) for column in _FINISH]
             valid_dates = [d for d in dates if d]
             return max(valid_dates) if valid_dates else None
         return None
 
+
+# Case-insensitive name lookups (TrainingService.get_employee_by_name)
+Index("ix_employees_name_lower", func.lower(Employee.EMPLOYEE_NAME))
+Index("ix_employees_full_name_lower", func.lower(Employee.full_name))
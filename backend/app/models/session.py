@@ -6,12 +6,23 @@ In-memory session management for authenticated users.
 Stores session state without modifying the database.
 """
 
-from datetime import datetime, timedelta
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from app.core.config import settings
 
 
+# Idle time after which a session expires
+_TIMEOUT = timedelta(minutes=settings.session_timeout_minutes)
+
+
+def _utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
 class UserSession(BaseModel):
     """
     User session model for managing authentication state.
@@ -33,8 +44,8 @@ class UserSession(BaseModel):
     employee_id: Optional[int] = None
     employee_name: Optional[str] = None
     is_ciso: bool = False
-    created_at: datetime = datetime.utcnow()
-    last_activity: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=_utcnow)
+    last_activity: datetime = Field(default_factory=_utcnow)
     metadata: Dict = {}
     
     def is_authenticated(self) -> bool:
@@ -53,12 +64,11 @@ class UserSession(BaseModel):
         Returns:
             True if session has exceeded timeout period
         """
-        timeout = timedelta(minutes=settings.session_timeout_minutes)
-        return datetime.utcnow() - self.last_activity > timeout
+        return _utcnow() - self.last_activity > _TIMEOUT
     
     def update_activity(self) -> None:
         """Update last activity timestamp to current time"""
-        self.last_activity = datetime.utcnow()
+        self.last_activity = _utcnow()
     
     def get_missing_fields(self) -> list[str]:
         """
@@ -74,9 +84,8 @@ class UserSession(BaseModel):
             missing.append("employee_name")
         return missing
     
-    class Config:
-        """Pydantic configuration"""
-        arbitrary_types_allowed = True
+    # Pydantic configuration
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 # In-memory session store (in production, use Redis or similar)
@@ -86,10 +95,19 @@ class SessionStore:
     
     In production, this should be replaced with Redis or a similar
     distributed cache to support multiple backend instances.
+    
+    Sessions are kept in order of last activity (oldest first), so expired
+    sessions are always at the front and a sweep can stop at the first
+    live one.
+    
+    Reads are lock-free. Mutations take a lock, because reordering and
+    expiry each touch the dict more than once and must not interleave
+    across worker threads.
     """
     
     def __init__(self):
-        self._sessions: Dict[str, UserSession] = {}
+        self._sessions: OrderedDict[str, UserSession] = OrderedDict()
+        self._lock = threading.Lock()
     
     def create_session(self, session_id: str) -> UserSession:
         """
@@ -102,7 +120,9 @@ class SessionStore:
             New UserSession instance
         """
         session = UserSession(session_id=session_id)
-        self._sessions[session_id] = session
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
         return session
     
     def get_session(self, session_id: str) -> Optional[UserSession]:
@@ -117,8 +137,10 @@ class SessionStore:
         """
         session = self._sessions.get(session_id)
         if session and session.is_expired():
-            # Remove expired session
-            del self._sessions[session_id]
+            # Remove expired session, unless it was replaced meanwhile
+            with self._lock:
+                if self._sessions.get(session_id) is session:
+                    self._sessions.pop(session_id, None)
             return None
         return session
     
@@ -139,7 +161,12 @@ class SessionStore:
                 if hasattr(session, key):
                     setattr(session, key, value)
             session.update_activity()
-            self._sessions[session_id] = session
+            with self._lock:
+                try:
+                    self._sessions.move_to_end(session_id)
+                except KeyError:
+                    # Deleted concurrently; the caller still gets its copy
+                    pass
         return session
     
     def delete_session(self, session_id: str) -> None:
@@ -149,8 +176,8 @@ class SessionStore:
         Args:
             session_id: Session identifier
         """
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        with self._lock:
+            self._sessions.pop(session_id, None)
     
     def cleanup_expired_sessions(self) -> int:
         """
@@ -159,13 +186,15 @@ class SessionStore:
         Returns:
             Number of sessions removed
         """
-        expired = [
-            sid for sid, session in self._sessions.items()
-            if session.is_expired()
-        ]
-        for sid in expired:
-            del self._sessions[sid]
-        return len(expired)
+        removed = 0
+        with self._lock:
+            while self._sessions:
+                session = next(iter(self._sessions.values()))
+                if not session.is_expired():
+                    break
+                self._sessions.popitem(last=False)
+                removed += 1
+        return removed
 
 
 # Global session store instance
@@ -7,12 +7,20 @@ Provides secure authentication without modifying database state.
 """
 
 import uuid
-from typing import Tuple, Optional
+from functools import cached_property
+from typing import NamedTuple, Tuple, Optional
 from sqlalchemy.orm import Session
 from app.models.session import UserSession, session_store
 from app.services.training_service import TrainingService
 
 
+class SessionInfo(NamedTuple):
+    """Authentication state of a session, read in a single lookup"""
+    is_authenticated: bool
+    is_ciso: bool
+    employee_id: Optional[int]
+
+
 class AuthService:
     """
     Service class for authentication operations.
@@ -24,6 +32,9 @@ class AuthService:
     # CISO employee ID (in production, use role-based system)
     CISO_EMPLOYEE_ID = "123456789"
     
+    # Session employee IDs are ints; compare against the ID as an int
+    _CISO_ID = int(CISO_EMPLOYEE_ID)
+    
     def __init__(self, db: Session):
         """
         Initialize authentication service.
@@ -32,7 +43,19 @@ class AuthService:
             db: SQLAlchemy database session
         """
         self.db = db
-        self.training_service = TrainingService(db)
+    
+    @cached_property
+    def training_service(self) -> TrainingService:
+        """
+        Training service for credential checks.
+        
+        Built on first use: most calls (session creation and lookups) never
+        query employee data.
+        
+        Returns:
+            TrainingService bound to this service's database session
+        """
+        return TrainingService(self.db)
     
     def create_session(self) -> str:
         """
@@ -81,28 +104,30 @@ class AuthService:
         if not session:
             return False, "Invalid session", None
         
-        # Update session with provided credentials
-        if employee_id is not None:
-            session_store.update_session(session_id, employee_id=employee_id)
-        if employee_name is not None:
-            session_store.update_session(session_id, employee_name=employee_name)
-        
-        # Get updated session
-        session = session_store.get_session(session_id)
+        # Merge provided credentials with those already on the session; the
+        # store is written once, after verification decides the outcome
+        if employee_id is None:
+            employee_id = session.employee_id
+        if employee_name is None:
+            employee_name = session.employee_name
         
         # Check if fully authenticated
-        if session and session.is_authenticated():
+        if employee_id is not None and employee_name is not None:
             # Verify credentials against database
             is_valid, employee = self.training_service.verify_employee_credentials(
-                session.employee_id,
-                session.employee_name
+                employee_id,
+                employee_name
             )
             
             if is_valid:
                 # Check if this employee is the CISO based on their ID from the database
-                is_ciso = (str(session.employee_id).zfill(9) == self.CISO_EMPLOYEE_ID)
-                session_store.update_session(session_id, is_ciso=is_ciso)
-                session = session_store.get_session(session_id)
+                is_ciso = (employee_id == self._CISO_ID)
+                session = session_store.update_session(
+                    session_id,
+                    employee_id=employee_id,
+                    employee_name=employee_name,
+                    is_ciso=is_ciso
+                )
                 
                 success_msg = "CISO authenticated successfully" if is_ciso else "Authentication successful"
                 return True, success_msg, session
@@ -115,11 +140,40 @@ class AuthService:
                 )
                 return False, "Invalid credentials. Employee ID and name do not match.", None
         else:
-            # Partially authenticated - ask for missing fields
+            # Partially authenticated - store what was given, ask for the rest
+            session = session_store.update_session(
+                session_id,
+                employee_id=employee_id,
+                employee_name=employee_name
+            )
             missing = session.get_missing_fields()
             missing_str = " and ".join(missing)
             return False, f"Please provide your {missing_str}", session
     
+    def get_session_info(self, session_id: str) -> SessionInfo:
+        """
+        Get the authentication state of a session.
+        
+        Equivalent to calling is_authenticated, is_ciso and
+        get_authenticated_employee_id, with one session lookup.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            SessionInfo for the session (unauthenticated if not found)
+        """
+        session = session_store.get_session(session_id)
+        if session is None:
+            return SessionInfo(False, False, None)
+        
+        is_authenticated = session.is_authenticated()
+        return SessionInfo(
+            is_authenticated,
+            session.is_ciso,
+            session.employee_id if is_authenticated else None
+        )
+    
     def is_authenticated(self, session_id: str) -> bool:
         """
         Check if session is fully authenticated.
@@ -6,10 +6,14 @@ Business logic for querying and analyzing cybersecurity training data.
 Provides read-only operations with comprehensive error handling.
 """
 
+import copy
+import operator
 from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.employee import Employee
+from sqlalchemy import func, select
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.employee import Employee, employee_email, video_duration_minutes
 
 
 class TrainingService:
@@ -20,11 +24,35 @@ class TrainingService:
     All operations are read-only to maintain data integrity.
     """
     
-    VIDEO_NAMES = {
-        1: "First Cybersecurity Video",
-        2: "Second Cybersecurity Video",
-        3: "Third Cybersecurity Video",
-        4: "Fourth Cybersecurity Video"
+    # Video names, indexed by video number - 1
+    VIDEO_NAMES = (
+        "First Cybersecurity Video",
+        "Second Cybersecurity Video",
+        "Third Cybersecurity Video",
+        "Fourth Cybersecurity Video",
+    )
+    
+    # (start, finish) date columns per video, in video order
+    VIDEO_DATE_COLUMNS = (
+        (Employee.START_FIRST_VIDEO_DATE, Employee.FINISH_FIRST_VIDEO_DATE),
+        (Employee.START_SECOND_VIDEO_DATE, Employee.FINISH_SECOND_VIDEO_DATE),
+        (Employee.START_THIRD_VIDEO_DATE, Employee.FINISH_THIRD_VIDEO_DATE),
+        (Employee.START_FOURTH_VIDEO_DATE, Employee.FINISH_FOURTH_VIDEO_DATE),
+    )
+    
+    # The same columns flattened for select(): start, finish, start, finish, ...
+    _DATE_COLUMNS = tuple(column for pair in VIDEO_DATE_COLUMNS for column in pair)
+    
+    # Training statuses (Employee.training_status values)
+    TRAINING_STATUSES = ("NOT_STARTED", "IN_PROGRESS", "FINISHED")
+    
+    # Supported video count comparisons
+    COUNT_OPERATORS = {
+        ">=": operator.ge,
+        "<=": operator.le,
+        "==": operator.eq,
+        ">": operator.gt,
+        "<": operator.lt,
     }
     
     def __init__(self, db: Session):
@@ -47,8 +75,10 @@ class TrainingService:
             Employee object if found, None otherwise
         """
         # Convert to string with padding
-        employee_id_str = str(employee_id).zfill(9)
-        return self.db.query(Employee).filter(Employee.EMPLOYEE_ID == employee_id_str).first()
+        employee_id_str = f"{employee_id:09d}"
+        # Primary-key lookup: served from the session's identity map when the
+        # employee is already loaded, with no query at all
+        return self.db.get(Employee, employee_id_str)
     
     def get_employee_by_name(self, name: str) -> Optional[Employee]:
         """
@@ -60,14 +90,17 @@ class TrainingService:
         Returns:
             Employee object if found, None otherwise
         """
-        # Try full name match first
-        employees = self.db.query(Employee).all()
-        for emp in employees:
-            if emp.full_name.lower() == name.lower():
-                return emp
-            if emp.EMPLOYEE_NAME.lower() == name.lower():
-                return emp
-        return None
+        name_lower = name.lower()
+        
+        # Try full name match first; both lookups use an index on lower(...)
+        employee = self.db.query(Employee).filter(
+            func.lower(Employee.full_name) == name_lower
+        ).first()
+        if employee is None:
+            employee = self.db.query(Employee).filter(
+                func.lower(Employee.EMPLOYEE_NAME) == name_lower
+            ).first()
+        return employee
     
     def verify_employee_credentials(
         self,
@@ -102,38 +135,52 @@ class TrainingService:
         """
         Get comprehensive status for a single employee.
         
+        Snapshots of found employees are cached for a short TTL, since the
+        training data is read-only. Each caller gets its own shallow copy of
+        the snapshot; the nested lists are shared and must not be modified.
+        
         Args:
             employee_id: Employee ID
             
         Returns:
             Dictionary with employee status information
         """
+        cached_status = status_cache.get(employee_id)
+        if cached_status is not None:
+            return copy.copy(cached_status)
+        
         employee = self.get_employee_by_id(employee_id)
         
         if not employee:
             return {"error": "Employee not found"}
         
-        completed_videos = employee.get_completed_videos()
-        missing_videos = employee.get_missing_videos()
-        
-        # Build video details
+        # One pass over the videos builds the details, the completed/missing
+        # lists and the total time (video_details is ordered by video number;
+        # callers index into it)
+        completed_videos = []
+        missing_videos = []
         video_details = []
-        for i in range(1, 5):  # Only 4 videos in this database
+        total_time = 0
+        for i, video_name in enumerate(self.VIDEO_NAMES, start=1):
+            completed = employee.get_video_completed(i)
+            duration = employee.get_video_duration(i)
+            (completed_videos if completed else missing_videos).append(i)
+            total_time += duration
             video_details.append({
                 "video_number": i,
-                "video_name": self.VIDEO_NAMES[i],
-                "completed": employee.get_video_completed(i),
-                "duration_minutes": employee.get_video_duration(i)
+                "video_name": video_name,
+                "completed": completed,
+                "duration_minutes": duration
             })
         
-        return {
+        status = {
             "employee_id": employee.EMPLOYEE_ID,
             "employee_name": employee.full_name,
             "email": employee.email,
             "department": employee.EMPLOYEE_DIVISION,
             "status": employee.get_training_status(),
             "completion_percentage": employee.completion_percentage,
-            "total_time_minutes": employee.total_time,
+            "total_time_minutes": total_time,
             "completed_videos": completed_videos,
             "completed_videos_count": len(completed_videos),
             "missing_videos": missing_videos,
@@ -142,6 +189,8 @@ class TrainingService:
             "started_at": employee.started_at.isoformat() if employee.started_at else None,
             "completed_at": employee.completed_at.isoformat() if employee.completed_at else None,
         }
+        status_cache.set(employee_id, copy.copy(status))
+        return status
     
     def get_employees_by_status(self, status: str) -> List[Dict]:
         """
@@ -153,24 +202,34 @@ class TrainingService:
         Returns:
             List of employee status dictionaries
         """
-        # Query all employees
-        employees = self.db.query(Employee).all()
+        if status not in self.TRAINING_STATUSES:
+            return []
         
-        # Filter by status
-        filtered_employees = []
-        for employee in employees:
-            if employee.get_training_status() == status:
-                filtered_employees.append({
-                    "employee_id": employee.id,
-                    "employee_name": employee.name,
-                    "email": employee.email,
-                    "department": employee.department,
-                    "status": status,
-                    "completion_percentage": employee.completion_percentage,
-                    "total_time_minutes": employee.total_time,
-                })
+        # Filter by status in the database and read plain column rows;
+        # only matching rows are fetched and no Employee objects are built
+        rows = self.db.execute(
+            select(
+                Employee.EMPLOYEE_ID,
+                Employee.EMPLOYEE_NAME,
+                Employee.EMPLOYEE_LAST_NAME,
+                Employee.EMPLOYEE_DIVISION,
+                *self._DATE_COLUMNS
+            ).where(Employee.training_status == status)
+        ).all()
         
-        return filtered_employees
+        employees = []
+        for employee_id, first_name, last_name, department, *dates in rows:
+            starts, finishes = dates[0::2], dates[1::2]
+            employees.append({
+                "employee_id": employee_id,
+                "employee_name": f"{first_name} {last_name}",
+                "email": employee_email(first_name, last_name),
+                "department": department,
+                "status": status,
+                "completion_percentage": sum(f is not None for f in finishes) * 25.0,
+                "total_time_minutes": sum(map(video_duration_minutes, starts, finishes)),
+            })
+        return employees
     
     def get_global_summary(self) -> Dict:
         """
@@ -179,33 +238,47 @@ class TrainingService:
         Returns:
             Dictionary with aggregated statistics
         """
-        # Get ALL employees (can't filter by hybrid properties in SQL)
-        all_employees = self.db.query(Employee).all()
+        # Count employees per status in the database
+        status_counts = dict(
+            self.db.execute(
+                select(Employee.training_status, func.count()).group_by(Employee.training_status)
+            ).all()
+        )
+        total_employees = sum(status_counts.values())
+        not_started_count = status_counts.get("NOT_STARTED", 0)
+        in_progress_count = status_counts.get("IN_PROGRESS", 0)
         
-        if not all_employees:
-            return {
-                "total_employees": 0,
-                "finished_employees_count": 0,
-                "not_started_count": 0,
-                "in_progress_count": 0,
-                "max_time_minutes": 0,
-                "min_time_minutes": 0,
-                "average_time_minutes": 0,
-                "fastest_employee": None,
-                "slowest_employee": None,
-            }
+        # Time statistics only need finished employees; read their name and
+        # date columns as plain rows, without loading Employee objects
+        rows = self.db.execute(
+            select(
+                Employee.EMPLOYEE_ID,
+                Employee.EMPLOYEE_NAME,
+                Employee.EMPLOYEE_LAST_NAME,
+                *self._DATE_COLUMNS
+            ).where(Employee.training_status == "FINISHED")
+        ).all()
         
-        # Filter by status in Python (hybrid properties can't be used in SQL WHERE)
-        finished_employees = [e for e in all_employees if e.get_training_status() == "FINISHED"]
-        not_started = [e for e in all_employees if e.get_training_status() == "NOT_STARTED"]
-        in_progress = [e for e in all_employees if e.get_training_status() == "IN_PROGRESS"]
+        # One pass over the finished employees: running total plus the
+        # fastest and slowest rows (first one wins on ties)
+        finished_count = 0
+        time_sum = 0
+        fastest = slowest = None  # (employee_id, first_name, last_name, total_time)
+        for employee_id, first_name, last_name, *dates in rows:
+            total_time = sum(map(video_duration_minutes, dates[0::2], dates[1::2]))
+            finished_count += 1
+            time_sum += total_time
+            if fastest is None or total_time < fastest[3]:
+                fastest = (employee_id, first_name, last_name, total_time)
+            if slowest is None or total_time > slowest[3]:
+                slowest = (employee_id, first_name, last_name, total_time)
         
-        if not finished_employees:
+        if not finished_count:
             return {
-                "total_employees": len(all_employees),
+                "total_employees": total_employees,
                 "finished_employees_count": 0,
-                "not_started_count": len(not_started),
-                "in_progress_count": len(in_progress),
+                "not_started_count": not_started_count,
+                "in_progress_count": in_progress_count,
                 "max_time_minutes": 0,
                 "min_time_minutes": 0,
                 "average_time_minutes": 0,
@@ -213,33 +286,23 @@ class TrainingService:
                 "slowest_employee": None,
             }
         
-        # Calculate statistics from finished employees
-        times = [e.total_time for e in finished_employees]
-        max_time = max(times)
-        min_time = min(times)
-        avg_time = sum(times) / len(times)
-        
-        # Find fastest and slowest
-        fastest = min(finished_employees, key=lambda e: e.total_time)
-        slowest = max(finished_employees, key=lambda e: e.total_time)
-        
         return {
-            "total_employees": len(all_employees),
-            "finished_employees_count": len(finished_employees),
-            "not_started_count": len(not_started),
-            "in_progress_count": len(in_progress),
-            "max_time_minutes": max_time,
-            "min_time_minutes": min_time,
-            "average_time_minutes": round(avg_time, 2),
+            "total_employees": total_employees,
+            "finished_employees_count": finished_count,
+            "not_started_count": not_started_count,
+            "in_progress_count": in_progress_count,
+            "max_time_minutes": slowest[3],
+            "min_time_minutes": fastest[3],
+            "average_time_minutes": round(time_sum / finished_count, 2),
             "fastest_employee": {
-                "id": fastest.id,
-                "name": fastest.name,
-                "time_minutes": fastest.total_time
+                "id": fastest[0],
+                "name": f"{fastest[1]} {fastest[2]}",
+                "time_minutes": fastest[3]
             },
             "slowest_employee": {
-                "id": slowest.id,
-                "name": slowest.name,
-                "time_minutes": slowest.total_time
+                "id": slowest[0],
+                "name": f"{slowest[1]} {slowest[2]}",
+                "time_minutes": slowest[3]
             },
         }
     
@@ -253,7 +316,9 @@ class TrainingService:
         Returns:
             Video name or error message
         """
-        return self.VIDEO_NAMES.get(video_number, f"Unknown video {video_number}")
+        if 1 <= video_number <= len(self.VIDEO_NAMES):
+            return self.VIDEO_NAMES[video_number - 1]
+        return f"Unknown video {video_number}"
     
     def search_employees(self, query: str) -> List[Employee]:
         """
@@ -280,35 +345,40 @@ class TrainingService:
         Returns:
             List of employee dictionaries
         """
-        all_employees = self.db.query(Employee).all()
-        filtered = []
+        compare = self.COUNT_OPERATORS.get(operator)
+        if compare is None:
+            return []
         
-        for emp in all_employees:
-            completed_count = len(emp.get_completed_videos())
-            
-            if operator == ">=" and completed_count >= count:
-                matches = True
-            elif operator == "<=" and completed_count <= count:
-                matches = True
-            elif operator == "==" and completed_count == count:
-                matches = True
-            elif operator == ">" and completed_count > count:
-                matches = True
-            elif operator == "<" and completed_count < count:
-                matches = True
-            else:
-                matches = False
-            
-            if matches:
-                filtered.append({
-                    "employee_id": emp.EMPLOYEE_ID,
-                    "employee_name": emp.full_name,
-                    "email": emp.email,
-                    "department": emp.EMPLOYEE_DIVISION,
-                    "completed_videos_count": completed_count,
-                    "completion_percentage": emp.completion_percentage,
-                    "status": emp.get_training_status(),
-                })
+        # Count finished videos, derive the status and filter in the
+        # database, reading plain column rows rather than Employee objects
+        completed_count = Employee.completed_videos_count
+        rows = self.db.execute(
+            select(
+                Employee.EMPLOYEE_ID,
+                Employee.EMPLOYEE_NAME,
+                Employee.EMPLOYEE_LAST_NAME,
+                Employee.EMPLOYEE_DIVISION,
+                completed_count.label("completed_count"),
+                Employee.training_status.label("training_status"),
+            ).where(compare(completed_count, count))
+        ).all()
         
-        return filtered
+        return [
+            {
+                "employee_id": employee_id,
+                "employee_name": f"{first_name} {last_name}",
+                "email": employee_email(first_name, last_name),
+                "department": department,
+                "completed_videos_count": completed,
+                "completion_percentage": completed * 25.0,
+                "status": training_status,
+            }
+            for employee_id, first_name, last_name, department, completed, training_status in rows
+        ]
+
 
+# Global employee status cache, keyed by employee ID
+status_cache = TTLCache(
+    ttl_seconds=settings.status_cache_ttl_seconds,
+    max_entries=settings.status_cache_max_entries,
+)
@@ -15,6 +15,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        # Installed by uvicorn[standard]; fail loudly rather than fall back
+        loop="uvloop",
+        http="httptools"
     )
 
@@ -5,72 +5,132 @@ Pytest Configuration and Fixtures
 Provides test fixtures and configuration for the test suite.
 """
 
+from datetime import datetime
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.agents.response_cache import response_cache
 from app.db.base import Base
 from app.db.session import get_db
 from app.models.employee import Employee
+from app.services.training_service import status_cache
 
 
 # Test database URL (in-memory SQLite)
-TEST_DATABASE_URL = "sqlite:///./test.db"
+TEST_DATABASE_URL = "sqlite://"
 
-# Create test engine
+# Create test engine; StaticPool shares the single in-memory connection
 engine = create_engine(
     TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Let SQLAlchemy emit BEGIN itself: the sqlite3 driver's implicit
+# transactions otherwise break the SAVEPOINTs used to isolate tests
+@event.listens_for(engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
 
-@pytest.fixture(scope="function")
-def db():
+
+@event.listens_for(engine, "begin")
+def _begin_transaction(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+@pytest.fixture(scope="session")
+def schema():
     """
-    Create a fresh database for each test.
+    Create the schema once for the whole test run.
     
     Yields:
-        Database session
+        None
     """
     Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Empty the process-wide caches so no test sees another test's data.
+    
+    Yields:
+        None
+    """
+    status_cache.clear()
+    response_cache.clear()
+    yield
+    status_cache.clear()
+    response_cache.clear()
+
+
+@pytest.fixture(scope="function")
+def db(schema):
+    """
+    Provide a database session whose changes are rolled back after each test.
     
-    # Add test data
-    test_employee = Employee(
-        id=1,
-        name="John Doe",
-        email="john.doe@company.com",
-        department="IT",
-        video_1_completed=True,
-        video_1_duration=15.5,
-        video_2_completed=True,
-        video_2_duration=20.0,
-        video_3_completed=False,
-        video_3_duration=0.0,
-        video_4_completed=False,
-        video_4_duration=0.0,
-        video_5_completed=False,
-        video_5_duration=0.0,
-        total_time=35.5,
-        completion_percentage=40.0
-    )
-    db.add(test_employee)
-    db.commit()
+    Commits inside the test only release a SAVEPOINT; the outer transaction
+    is rolled back at teardown, so every test starts from the same data.
     
-    yield db
+    Yields:
+        Database session
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        # Add test data: videos 1 and 2 finished (15.5 + 20 minutes)
+        test_employee = Employee(
+            EMPLOYEE_ID="000000001",
+            EMPLOYEE_NAME="John",
+            EMPLOYEE_LAST_NAME="Doe",
+            EMPLOYEE_DIVISION="IT",
+            START_FIRST_VIDEO_DATE=datetime(2024, 1, 1, 9, 0),
+            FINISH_FIRST_VIDEO_DATE=datetime(2024, 1, 1, 9, 15, 30),
+            START_SECOND_VIDEO_DATE=datetime(2024, 1, 2, 9, 0),
+            FINISH_SECOND_VIDEO_DATE=datetime(2024, 1, 2, 9, 20),
+        )
+        db.add(test_employee)
+        db.commit()
+        
+        yield db
+    finally:
+        # Runs even when setup fails, so the shared connection is never
+        # left inside an open transaction for the following tests
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """
+    Create one test client for the whole test run.
     
-    db.close()
-    Base.metadata.drop_all(bind=engine)
+    The application lifespan runs once instead of once per test.
+    
+    Yields:
+        FastAPI test client
+    """
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db):
+def client(app_client, db):
     """
-    Create a test client with database override.
+    Provide the shared test client with this test's database override.
     
     Yields:
         FastAPI test client
@@ -83,8 +143,7 @@ def client(db):
     
     app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as test_client:
-        yield test_client
+    yield app_client
     
     app.dependency_overrides.clear()
 
@@ -5,9 +5,14 @@ API Tests
 Tests for API endpoints.
 """
 
+import json
+from types import SimpleNamespace
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.agents import training_agent
+
 
 def test_health_check(client: TestClient):
     """Test health check endpoint"""
@@ -90,6 +95,32 @@ def test_chat_without_auth(client: TestClient):
     assert data["requires_auth"] is True
 
 
+def test_chat_stream_without_auth(client: TestClient):
+    """Test streamed chat without authentication"""
+    # Create session
+    session_response = client.post("/api/session/create")
+    session_id = session_response.json()["session_id"]
+    
+    # Try to chat without auth
+    chat_response = client.post(
+        "/api/chat/stream",
+        json={
+            "session_id": session_id,
+            "query": "What is my training status?"
+        }
+    )
+    
+    assert chat_response.status_code == 200
+    assert chat_response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line[len("data: "):])
+        for line in chat_response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[-1]["done"] is True
+    assert events[-1]["requires_auth"] is True
+
+
 def test_chat_with_auth(client: TestClient):
     """Test chat with authentication"""
     # Create session
@@ -121,6 +152,92 @@ def test_chat_with_auth(client: TestClient):
     assert "response" in data
 
 
+def test_chat_stream_with_auth(client: TestClient):
+    """Test streamed chat with authentication"""
+    # Create session
+    session_response = client.post("/api/session/create")
+    session_id = session_response.json()["session_id"]
+    
+    # Authenticate
+    client.post(
+        "/api/authenticate",
+        json={
+            "session_id": session_id,
+            "employee_id": 1,
+            "employee_name": "John Doe"
+        }
+    )
+    
+    # Chat
+    chat_response = client.post(
+        "/api/chat/stream",
+        json={
+            "session_id": session_id,
+            "query": "What is my training status?"
+        }
+    )
+    
+    assert chat_response.status_code == 200
+    events = [
+        json.loads(line[len("data: "):])
+        for line in chat_response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    deltas = [event["delta"] for event in events[:-1]]
+    assert deltas
+    assert "John Doe" in "".join(deltas)
+    assert events[-1]["done"] is True
+    assert events[-1]["success"] is True
+    assert events[-1]["intent"] == "employee_status"
+    assert "response" not in events[-1]
+
+
+def test_chat_llm_error_fallback_not_cached(client: TestClient, monkeypatch):
+    """Test the rule-based answer used during an LLM outage is not cached"""
+    provider = {"up": False}
+    
+    async def create(**kwargs):
+        if not provider["up"]:
+            raise ConnectionError("provider unavailable")
+        message = SimpleNamespace(content="LLM answer")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    
+    monkeypatch.setattr(training_agent, "USE_OPENAI", True)
+    monkeypatch.setattr(
+        training_agent,
+        "get_openai_client",
+        lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    )
+    
+    # Create session and authenticate
+    session_response = client.post("/api/session/create")
+    session_id = session_response.json()["session_id"]
+    
+    client.post(
+        "/api/authenticate",
+        json={
+            "session_id": session_id,
+            "employee_id": 1,
+            "employee_name": "John Doe"
+        }
+    )
+    
+    chat_request = {
+        "session_id": session_id,
+        "query": "What is my training status?"
+    }
+    
+    # Provider down: rule-based answer
+    data = client.post("/api/chat", json=chat_request).json()
+    assert data["success"] is True
+    assert "John Doe" in data["response"]
+    
+    # Provider back: the LLM answers instead of the cached fallback
+    provider["up"] = True
+    data = client.post("/api/chat", json=chat_request).json()
+    assert data["response"] == "LLM answer"
+
+
 def test_employee_status(client: TestClient):
     """Test employee status endpoint"""
     # Create session and authenticate
@@ -145,6 +262,6 @@ def test_employee_status(client: TestClient):
     assert status_response.status_code == 200
     data = status_response.json()
     assert data["success"] is True
-    assert data["data"]["employee_id"] == 1
-    assert data["data"]["completion_percentage"] == 40.0
+    assert data["data"]["employee_id"] == "000000001"
+    assert data["data"]["completion_percentage"] == 50.0
 
@@ -6,7 +6,7 @@ Tests for security guardrails.
 """
 
 import pytest
-from app.agents.guardrails import Guardrails
+from app.agents.guardrails import Guardrails, ResponseStreamSanitizer
 
 
 def test_valid_training_query():
@@ -22,6 +22,11 @@ def test_sql_injection_attempt():
         "'; DROP TABLE employees; --"
     )
     assert is_valid is False
+    
+    is_valid, error = Guardrails.validate_query(
+        "Show training status' or 1=1 --"
+    )
+    assert is_valid is False
     assert "Invalid query format" in error
 
 
@@ -78,4 +83,24 @@ def test_response_sanitization():
     response = "Here's your data: ```sql SELECT * FROM employees```"
     sanitized = Guardrails.sanitize_response(response)
     assert "```sql" not in sanitized
-
+    
+    response = "[SYSTEM]hidden[/SYSTEM]You finished <system>x</system>2 videos"
+    sanitized = Guardrails.sanitize_response(response)
+    assert sanitized == "You finished 2 videos"
+    
+    # Removing the inner block must not leave the outer one behind
+    response = "<sys[SYSTEM]x[/SYSTEM]tem>leak</system> ok"
+    assert Guardrails.sanitize_response(response) == "ok"
+
+
+@pytest.mark.parametrize("response", [
+    "  You finished [SYSTEM]hidden[/SYSTEM]2 videos <system>x</system> ",
+    "<sys[SYSTEM]x[/SYSTEM]tem>leak</system> ok",
+])
+def test_streamed_response_sanitization(response):
+    """Test sanitizing a response that arrives in chunks"""
+    for size in range(1, len(response) + 1):
+        sanitizer = ResponseStreamSanitizer()
+        chunks = [response[i:i + size] for i in range(0, len(response), size)]
+        streamed = "".join(sanitizer.feed(chunk) for chunk in chunks) + sanitizer.finish()
+        assert streamed == Guardrails.sanitize_response(response)
@@ -51,6 +51,33 @@ def test_extract_status():
     assert status == "FINISHED"
 
 
+def test_extract_status_priority():
+    """Test that 'not started' takes precedence over 'started'"""
+    query = "Which employees have not started?"
+    status = IntentParser.extract_status(query)
+    assert status == "NOT_STARTED"
+
+
+def test_extract_employee_mention():
+    """Test pronouns are matched as whole words"""
+    assert IntentParser.extract_employee_mention("Did I finish video 2?") == "self"
+    assert IntentParser.extract_employee_mention("Show his video progress") == "other"
+
+
+def test_extract_employee_name():
+    """Test employee name extraction"""
+    assert IntentParser.extract_employee_name("What is Eli Vardi's status") == "Eli Vardi"
+    assert IntentParser.extract_employee_name("what is eli vardi's status") is None
+
+
+def test_extract_video_count_filter():
+    """Test video count filter extraction"""
+    assert IntentParser.extract_video_count_filter("who finished 2 or more videos") == {"count": 2, "operator": ">="}
+    assert IntentParser.extract_video_count_filter("less than three videos") == {"count": 3, "operator": "<"}
+    assert IntentParser.extract_video_count_filter("who watched 2 videos or less") == {"count": 2, "operator": "<="}
+    assert IntentParser.extract_video_count_filter("no count here") is None
+
+
 def test_is_ciso_query():
     """Test CISO query detection"""
     query = "Show me all employees' training status"
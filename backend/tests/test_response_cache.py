@@ -0,0 +1,68 @@
+"""
+Response Cache Tests
+~~~~~~~~~~~~~~~~~~~~
+
+Tests for the chat response cache.
+"""
+
+import pytest
+from app.agents.intent_parser import IntentParser
+from app.agents.response_cache import ResponseCache
+
+
+def make_key(query, employee_id, is_ciso, target_employee_id=None):
+    """Build a cache key the way the agent does, after parsing the query"""
+    if target_employee_id is None:
+        target_employee_id = employee_id
+    parsed = IntentParser.parse(query)
+    return ResponseCache.make_key(query, parsed, employee_id, is_ciso, target_employee_id)
+
+
+def test_cache_hit_for_normalized_query():
+    """Test trivially different phrasings share a cache entry"""
+    cache = ResponseCache(ttl_seconds=60, max_entries=10)
+    cache.set(make_key("What is my status?", 1, False), {"response": "ok"})
+    
+    key = make_key("  what is my   STATUS ", 1, False)
+    assert cache.get(key) == {"response": "ok"}
+
+
+def test_cache_is_per_user():
+    """Test cached answers are not shared between users"""
+    cache = ResponseCache(ttl_seconds=60, max_entries=10)
+    cache.set(make_key("What is my status?", 1, False), {"response": "ok"})
+    
+    assert cache.get(make_key("What is my status?", 2, False)) is None
+    assert cache.get(make_key("What is my status?", 1, True)) is None
+
+
+def test_cache_keeps_casings_that_parse_differently_apart():
+    """Test a named employee and the lowercased question do not share an entry"""
+    cache = ResponseCache(ttl_seconds=60, max_entries=10)
+    # Only the capitalized question names Eli Vardi; the lowercased one is
+    # about the CISO's own record
+    named = make_key("What is Eli Vardi's training status", 123456789, True, 987654321)
+    cache.set(named, {"response": "Eli Vardi"})
+    
+    own = make_key("what is eli vardi's training status", 123456789, True)
+    assert own != named
+    assert cache.get(own) is None
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the oldest entry is evicted when the cache is full"""
+    cache = ResponseCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", {"response": "a"})
+    cache.set("b", {"response": "b"})
+    cache.get("a")
+    cache.set("c", {"response": "c"})
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == {"response": "a"}
+
+
+def test_cache_disabled_with_zero_ttl():
+    """Test a zero TTL disables caching"""
+    cache = ResponseCache(ttl_seconds=0, max_entries=10)
+    cache.set("a", {"response": "a"})
+    assert cache.get("a") is None
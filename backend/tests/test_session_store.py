@@ -0,0 +1,45 @@
+"""
+Session Store Tests
+~~~~~~~~~~~~~~~~~~~
+
+Tests for the in-memory session store.
+"""
+
+from datetime import datetime, timedelta, timezone
+from app.models.session import SessionStore
+
+
+def test_cleanup_removes_only_expired_sessions():
+    """Test the expiry sweep removes idle sessions and keeps active ones"""
+    store = SessionStore()
+    for session_id in ("a", "b", "c"):
+        store.create_session(session_id)
+        store.update_session(session_id)
+    
+    # Sessions "a" and "b" have been idle for longer than the timeout
+    store._sessions["a"].last_activity = datetime.now(timezone.utc) - timedelta(days=1)
+    store._sessions["b"].last_activity = datetime.now(timezone.utc) - timedelta(days=1)
+    
+    assert store.cleanup_expired_sessions() == 2
+    assert store.get_session("a") is None
+    assert store.get_session("c") is not None
+
+
+def test_update_moves_session_to_back():
+    """Test updating a session marks it as the most recently active"""
+    store = SessionStore()
+    store.create_session("a")
+    store.create_session("b")
+    store.update_session("a", employee_name="Charlie")
+    
+    assert list(store._sessions) == ["b", "a"]
+
+
+def test_new_session_timestamps_are_current():
+    """Test each session is stamped when it is created, not at import"""
+    before = datetime.now(timezone.utc)
+    session = SessionStore().create_session("a")
+    
+    assert session.created_at >= before
+    assert session.last_activity >= before
+    assert not session.is_expired()
@@ -0,0 +1,155 @@
+"""
+Training Agent Tests
+~~~~~~~~~~~~~~~~~~~~
+
+Tests for the rule-based response formatter.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+from app.agents.guardrails import Guardrails
+from app.agents.intent_parser import Intent
+from app.agents.response_cache import response_cache
+from app.agents import training_agent
+from app.agents.training_agent import TrainingAgent
+
+
+@pytest.fixture
+def agent():
+    """Create an agent; the formatter never touches the database"""
+    return TrainingAgent(Session())
+
+
+@pytest.mark.parametrize("example, query, context_data", [
+    (
+        training_agent._STATUS_EXAMPLE,
+        "What is my training status?",
+        {
+            "employee_name": "Dana Levi",
+            "status": "IN_PROGRESS",
+            "completion_percentage": 50.0,
+            "completed_videos": [1, 2],
+            "missing_videos": [3, 4],
+            "total_time_minutes": 42,
+        },
+    ),
+    (
+        training_agent._VIDEOS_EXAMPLE,
+        "Which videos do I still need to watch?",
+        {
+            "missing_videos": [4],
+            "video_details": [
+                {"video_number": 4, "video_name": "Fourth Cybersecurity Video", "completed": False, "duration_minutes": 0.0},
+            ],
+        },
+    ),
+    (
+        training_agent._GLOBAL_EXAMPLE,
+        "How is the company doing overall?",
+        {
+            "total_employees": 120,
+            "finished_employees_count": 80,
+            "not_started_count": 15,
+            "in_progress_count": 25,
+            "max_time_minutes": 95.0,
+            "min_time_minutes": 30.0,
+            "average_time_minutes": 55.5,
+            "fastest_employee": {"id": "123456780", "name": "Noa Cohen", "time_minutes": 30.0},
+            "slowest_employee": {"id": "123456781", "name": "Avi Levi", "time_minutes": 95.0},
+        },
+    ),
+])
+def test_prompt_examples_match_mock_response(agent, example, query, context_data):
+    """Test each system prompt example shows the formatter's exact output"""
+    response = Guardrails.sanitize_response(agent._mock_response(query, context_data))
+    
+    assert example.endswith(
+        f"RELEVANT DATA:\n{agent._format_context_data(context_data)}\n"
+        f"USER QUESTION: {query}\n"
+        f"Response:\n{response}"
+    )
+
+
+def test_mock_response_all_video_durations(agent):
+    """Test every video's duration and the total are listed"""
+    context_data = {
+        "all_videos": [
+            {"video_number": 1, "video_name": "First Video", "completed": True, "duration_minutes": 12},
+            {"video_number": 2, "video_name": "Second Video", "completed": True, "duration_minutes": 8.5},
+            {"video_number": 3, "video_name": "Third Video", "completed": False, "duration_minutes": 0.0},
+        ]
+    }
+    
+    response = agent._mock_response("How long were the videos?", context_data)
+    
+    assert response == (
+        "\n**Video Durations:**\n"
+        "✅ Video 1: First Video (12 min)\n"
+        "✅ Video 2: Second Video (8.5 min)\n"
+        "❌ Video 3: Third Video (0.0 min)\n"
+        "\n"
+        "**Total Time Spent:** 20.5 minutes"
+    )
+
+
+class FailingStream:
+    """OpenAI-like completion stream that fails after its first delta"""
+    
+    def __aiter__(self):
+        return self._chunks()
+    
+    async def _chunks(self):
+        delta = SimpleNamespace(content="Partial answer about")
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        raise ConnectionError("stream interrupted")
+
+
+@pytest.mark.asyncio
+async def test_stream_failing_midway_is_not_cached(agent, monkeypatch):
+    """Test a stream that fails after its first delta reports an incomplete answer"""
+    async def create(**kwargs):
+        return FailingStream()
+    
+    monkeypatch.setattr(training_agent, "USE_OPENAI", True)
+    agent.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    cache_key = ("stream-test",)
+    
+    events = [
+        event async for event in agent._stream_answer(
+            "What is my training status?", cache_key, Intent.EMPLOYEE_STATUS, {"status": "IN_PROGRESS"}
+        )
+    ]
+    
+    assert events[0] == {"delta": "Partial answer about"}
+    assert events[-1]["done"] is True
+    assert events[-1]["success"] is False
+    assert events[-1]["error"]
+    assert response_cache.get(cache_key) is None
+
+
+@pytest.mark.asyncio
+async def test_stream_failing_before_output_falls_back_uncached(agent, monkeypatch):
+    """Test a stream that fails at once streams the rule-based answer, uncached"""
+    async def create(**kwargs):
+        raise ConnectionError("provider unavailable")
+    
+    monkeypatch.setattr(training_agent, "USE_OPENAI", True)
+    agent.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    cache_key = ("stream-test",)
+    context_data = {"status": "IN_PROGRESS"}
+    
+    events = [
+        event async for event in agent._stream_answer(
+            "What is my training status?", cache_key, Intent.EMPLOYEE_STATUS, context_data
+        )
+    ]
+    
+    assert "".join(event.get("delta", "") for event in events) == "Status: **IN_PROGRESS**"
+    assert events[-1]["success"] is True
+    assert response_cache.get(cache_key) is None